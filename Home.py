@@ -1,8 +1,7 @@
 import streamlit as st
 import time
-import yfinance as yf
 # [NEW] 공통 로직 불러오기
-from utils import init_connection, add_user_to_db, sync_missing_data
+from utils import init_connection, add_user_to_db, sync_missing_data, sync_page_budget, render_ticker
 
 # --- 페이지 설정 ---
 st.set_page_config(
@@ -12,24 +11,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# --- 실시간 데이터 가져오기 ---
-@st.cache_data(ttl=300)
-def get_market_data():
-    symbols = ['MSFT', 'NVDA', 'AAPL', 'BTC-USD']
-    data_list = []
-    try:
-        tickers = yf.Tickers(' '.join(symbols))
-        for symbol in symbols:
-            info = tickers.tickers[symbol].fast_info
-            price = info.last_price
-            prev_close = info.previous_close
-            change_pct = ((price - prev_close) / prev_close) * 100
-            name = symbol.replace('-USD', '')
-            data_list.append({"name": name, "price": f"{price:,.2f}", "change": change_pct})
-    except Exception:
-        data_list = [{"name": "SYSTEM", "price": "ONLINE", "change": 0.0}]
-    return data_list
-
 # --- 커스텀 CSS (보내주신 디자인 100% 유지) ---
 st.markdown("""
 <style>
@@ -229,119 +210,97 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- 실제 데이터 생성 ---
-market_data = get_market_data()
-ticker_html_content = ""
-
-for item in market_data:
-    if item['change'] > 0:
-        color_class = "up"
-        arrow = "▲"
-        sign = "+"
-    elif item['change'] < 0:
-        color_class = "down"
-        arrow = "▼"
-        sign = ""
-    else:
-        color_class = "flat"
-        arrow = "-"
-        sign = ""
-    ticker_html_content += f"""<span class="ticker-item">{item['name']}: ${item['price']} <span class="{color_class}">{arrow} {sign}{item['change']:.2f}%</span></span>"""
-
-ticker_html_content += """<span class="ticker-item">GITHUB: <span class="up">OPERATIONAL</span></span><span class="ticker-item">MARKET: <span class="up">OPEN 24/7</span></span>"""
-
 with st.sidebar:
     if st.button("Go to Ranking", use_container_width=True):
         st.switch_page("pages/1-Ranking.py")
     if st.button("Go to GeekNews", use_container_width=True):
         st.switch_page("pages/2-GEEKNEWS.py")
 
-# 티커 렌더링
-st.markdown(f"""
-<div class="ticker-wrap">
-<div class="ticker">
-{ticker_html_content}
-</div>
-</div>
-""", unsafe_allow_html=True)
+# 티커 렌더링 (자체 주기로 갱신되는 fragment)
+render_ticker(extra_items=(("GITHUB", "OPERATIONAL", "up"), ("MARKET", "OPEN 24/7", "up")))
 
 # --- 메인 로직 ---
 if 'user_data' not in st.session_state:
     st.session_state['user_data'] = []
 
-try:
-    col_header, col_settings = st.columns([3, 1])
-except TypeError:
-    col_header, col_settings = st.columns([3, 1])
+# 상장 입력 영역: 인원수/입력 위젯 조작 시 이 영역만 rerun (CSS·티커는 다시 보내지 않음)
+@st.fragment
+def listing_section():
+    try:
+        col_header, col_settings = st.columns([3, 1])
+    except TypeError:
+        col_header, col_settings = st.columns([3, 1])
 
-with col_header:
-    st.markdown("""
-        <div class="floating-header">
-            <div class="main-title">Commit Stock Market</div>
-            <div class="sub-title">Evaluate your development assets objectively.</div>
-        </div>
-    """, unsafe_allow_html=True)
+    with col_header:
+        st.markdown("""
+            <div class="floating-header">
+                <div class="main-title">Commit Stock Market</div>
+                <div class="sub-title">Evaluate your development assets objectively.</div>
+            </div>
+        """, unsafe_allow_html=True)
 
-with col_settings:
-    st.write("") 
-    st.write("") 
-    st.markdown("<div style='margin-top: 45px;'></div>", unsafe_allow_html=True)
-    num_users = st.number_input("PARTICIPANTS", min_value=1, max_value=5, value=2)
+    with col_settings:
+        st.write("") 
+        st.write("") 
+        st.markdown("<div style='margin-top: 45px;'></div>", unsafe_allow_html=True)
+        num_users = st.number_input("PARTICIPANTS", min_value=1, max_value=5, value=2)
 
-st.divider()
+    st.divider()
 
-with st.form("listing_form"):
-    st.markdown('<div style="font-size:1.1rem; font-weight:600; color:#E0E0E0; margin-bottom:1rem;">MARKET ADMISSION DETAILS</div>', unsafe_allow_html=True)
+    with st.form("listing_form"):
+        st.markdown('<div style="font-size:1.1rem; font-weight:600; color:#E0E0E0; margin-bottom:1rem;">MARKET ADMISSION DETAILS</div>', unsafe_allow_html=True)
     
-    cols = st.columns(int(num_users))
-    users_temp = []
+        cols = st.columns(int(num_users))
+        users_temp = []
     
-    for i, col in enumerate(cols):
-        with col:
-            with st.container(border=True):
-                st.markdown(f"**ASSET 0{i+1}**")
-                nickname = st.text_input("Nickname", key=f"nick_{i}", placeholder="User ID", label_visibility="collapsed")
-                st.caption("Asset Name (ID)")
-                repo_url = st.text_input("Repo URL", key=f"repo_{i}", placeholder="Repo URL", label_visibility="collapsed")
-                st.caption("Source Code URL")
-                users_temp.append({"nickname": nickname, "repo_url": repo_url})
+        for i, col in enumerate(cols):
+            with col:
+                with st.container(border=True):
+                    st.markdown(f"**ASSET 0{i+1}**")
+                    nickname = st.text_input("Nickname", key=f"nick_{i}", placeholder="User ID", label_visibility="collapsed")
+                    st.caption("Asset Name (ID)")
+                    repo_url = st.text_input("Repo URL", key=f"repo_{i}", placeholder="Repo URL", label_visibility="collapsed")
+                    st.caption("Source Code URL")
+                    users_temp.append({"nickname": nickname, "repo_url": repo_url})
     
-    st.write("") 
-    submit_btn = st.form_submit_button("CONFIRM LISTING", use_container_width=True, type="primary")
+        st.write("") 
+        submit_btn = st.form_submit_button("CONFIRM LISTING", use_container_width=True, type="primary")
 
-# --- [추가] 제출 버튼 로직 ---
-if submit_btn:
-    valid_data = [u for u in users_temp if u['nickname'].strip() and u['repo_url'].strip()]
+    # --- [추가] 제출 버튼 로직 ---
+    if submit_btn:
+        valid_data = [u for u in users_temp if u['nickname'].strip() and u['repo_url'].strip()]
     
-    if len(valid_data) < num_users:
-        st.toast("⚠️ 모든 자산 정보를 입력해야 상장이 가능합니다.", icon="🚨")
-    else:
-        # 1. DB 연결 체크
-        conn = init_connection()
-        if not conn:
-            st.error("DB 연결 실패! secrets.toml 설정을 확인하세요.")
+        if len(valid_data) < num_users:
+            st.toast("⚠️ 모든 자산 정보를 입력해야 상장이 가능합니다.", icon="🚨")
         else:
-            # 2. UI 효과 (처리 중)
-            msg = st.toast("상장 심사 서류 검토 중...", icon="📂")
-            progress_bar = st.progress(0)
+            # 1. DB 연결 체크
+            conn = init_connection()
+            if not conn:
+                st.error("DB 연결 실패! secrets.toml 설정을 확인하세요.")
+            else:
+                # 2. UI 효과 (처리 중)
+                msg = st.toast("상장 심사 서류 검토 중...", icon="📂")
+                progress_bar = st.progress(0)
             
-            # 3. 데이터 저장 (Loop)
-            for idx, user in enumerate(valid_data):
-                # DB에 유저 추가
-                add_user_to_db(conn, user['nickname'], user['repo_url'])
-                time.sleep(0.3) # 연출용 딜레이
-                progress_bar.progress(int((idx + 1) / len(valid_data) * 50))
+                # 3. 데이터 저장 (Loop)
+                for idx, user in enumerate(valid_data):
+                    # DB에 유저 추가
+                    add_user_to_db(conn, user['nickname'], user['repo_url'])
+                    time.sleep(0.3) # 연출용 딜레이
+                    progress_bar.progress(int((idx + 1) / len(valid_data) * 50))
             
-            # 4. 데이터 동기화 (GitHub API)
-            msg.toast("자산 가치 평가 중 (GitHub Data Sync)...", icon="⏳")
-            sync_missing_data(conn) 
-            progress_bar.progress(100)
+                # 4. 데이터 동기화 (GitHub API)
+                msg.toast("자산 가치 평가 중 (GitHub Data Sync)...", icon="⏳")
+                sync_missing_data(conn, budget=sync_page_budget())
+                progress_bar.progress(100)
             
-            msg.toast("상장 승인 완료! 시장으로 이동합니다.", icon="✅")
-            time.sleep(0.8)
+                msg.toast("상장 승인 완료! 시장으로 이동합니다.", icon="✅")
+                time.sleep(0.8)
             
-            # 5. 페이지 이동 (Ranking.py)
-            try:
-                st.switch_page("pages/1-Ranking.py")
-            except Exception:
-                st.error("이동할 페이지(Ranking.py)를 찾을 수 없습니다.")
\ No newline at end of file
+                # 5. 페이지 이동 (Ranking.py)
+                try:
+                    st.switch_page("pages/1-Ranking.py")
+                except Exception:
+                    st.error("이동할 페이지(Ranking.py)를 찾을 수 없습니다.")
+
+listing_section()
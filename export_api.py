@@ -0,0 +1,250 @@
+"""읽기 전용 리더보드 내보내기 API (Streamlit 과 별도 프로세스)
+
+다른 대시보드가 Streamlit 페이지를 긁거나 MySQL 을 직접 조회하지 않도록, 랭킹 계산 결과를
+미리 계산한 캐시에서 JSON / CSV 로 제공합니다.
+
+- GET /leaderboard[?format=csv&prefix=&page=&page_size=]  전체 리더보드 (순위, 7D MA, 변동)
+- GET /series[?format=csv&user=닉네임]                   유저별 최근 15일 7D MA 시계열
+- GET /market[?format=csv]                                커밋 시장 지수(전체 7D MA 평균) + 시세 티커
+- GET /healthz                                            캐시 데이터 버전 / 갱신 시각
+
+데이터 버전(utils.get_data_version)이 바뀔 때만 다시 계산하고, 응답에는 ETag / Cache-Control 을 붙여
+If-None-Match 로 폴링하면 304 (본문 없음) 를 돌려줍니다.
+
+실행)
+    python export_api.py --port 8600 --poll 30
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from utils import init_engine, get_data_version, load_leaderboard, load_commit_history, get_market_data
+
+SERIES_DAYS = 15
+BODY_CACHE_SIZE = 512       # 버전당 보관할 (경로, 쿼리) 응답 수
+ROUTES = {"/leaderboard": ("prefix", "page", "page_size"), "/series": ("user",), "/market": ()}
+COLUMNS = {"/leaderboard": ["ranking", "nickname", "curr_ma", "diff"], "/series": ["nickname", "date", "ma7"], "/market": ["date", "index"]}
+
+def _to_csv(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+def parse_params(path, query):
+    # 잘못된 값은 ValueError → 400
+    fmt = query.get("format", "json")
+    if fmt not in ("json", "csv"):
+        raise ValueError("format must be json or csv")
+    params = {"format": fmt}
+    for name in ROUTES[path]:
+        if name not in query: continue
+        value = query[name].strip()
+        if name in ("page", "page_size"):
+            if not value.isdigit() or int(value) < 1:
+                raise ValueError(f"{name} must be a positive integer")
+            value = int(value) if name == "page" else min(int(value), 1000)
+        params[name] = value
+    if "page_size" in params and "page" not in params:
+        params["page"] = 1
+    return params
+
+# --- 1. 사전 계산 캐시 ---
+# 데이터 버전(+ 시세)마다 불변 스냅샷 1개. ETag 는 (태그, 경로, 쿼리) 로 정해지므로
+# If-None-Match 확인에는 직렬화 / 해시가 필요 없고, 본문은 (경로, 쿼리) 별로 처음 한 번만 만듦
+# 태그: /leaderboard, /series 는 데이터 버전만, /market 은 데이터 버전 + 시세 (시세만 바뀌면 /market 만 새 ETag)
+class ExportSnapshot:
+    def __init__(self, version, leaderboard, series, market_index, quotes, bodies=None):
+        self.version = version
+        self.leaderboard = leaderboard
+        self.series = series
+        self.market_index = market_index
+        self.quotes = quotes
+        quotes_tag = hashlib.sha1(json.dumps(quotes, sort_keys=True, default=str).encode()).hexdigest()[:8]
+        self.market_tag = f"{version}-{quotes_tag}"
+        self._bodies = dict(bodies or {})
+        self._lock = threading.Lock()
+        # 필터 없는 기본 응답은 갱신 시점에 미리 생성 (넘겨받은 본문은 그대로 사용)
+        for path in ROUTES:
+            for fmt in ("json", "csv"):
+                self.response(path, {"format": fmt})
+
+    def with_quotes(self, quotes):
+        # 시세만 바뀐 경우: 리더보드 / 시계열 본문은 재사용하고 /market 만 새로 만듦
+        bodies = {key: value for key, value in self._bodies.items() if key[0] != "/market"}
+        return ExportSnapshot(self.version, self.leaderboard, self.series, self.market_index, quotes, bodies)
+
+    def etag(self, path, params):
+        tag = self.market_tag if path == "/market" else self.version
+        key = f"{tag}|{path}|{sorted(params.items())}"
+        return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+    def response(self, path, params):
+        key = (path, tuple(sorted(params.items())))
+        with self._lock:
+            cached = self._bodies.get(key)
+        if cached is not None: return cached
+
+        payload, rows = self._build(path, params)
+        if params["format"] == "csv":
+            body, content_type = _to_csv(rows, COLUMNS[path]), "text/csv; charset=utf-8"
+        else:
+            body, content_type = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+        cached = (self.etag(path, params), body, content_type)
+        with self._lock:
+            if len(self._bodies) >= BODY_CACHE_SIZE:
+                self._bodies.pop(next(iter(self._bodies)))
+            self._bodies[key] = cached
+        return cached
+
+    def _build(self, path, params):
+        if path == "/leaderboard":
+            rows = self.leaderboard
+            if params.get("prefix"):
+                prefix = params["prefix"].lower()
+                rows = [r for r in rows if r["nickname"].lower().startswith(prefix)]
+            total = len(rows)
+            if "page" in params:
+                page_size = params.get("page_size", 100)
+                rows = rows[(params["page"] - 1) * page_size: params["page"] * page_size]
+            return {"version": self.version, "total": total, "items": rows}, rows
+        if path == "/series":
+            rows = self.series
+            if "user" in params:
+                rows = [r for r in rows if r["nickname"] == params["user"]]
+            return {"version": self.version, "items": rows}, rows
+        return {"version": self.version, "index": self.market_index, "quotes": self.quotes}, self.market_index
+
+class ExportCache:
+    def __init__(self, engine, poll):
+        self.engine = engine
+        self.poll = poll
+        self.snapshot = None
+        self.updated_at = None
+
+    def refresh(self):
+        version = get_data_version(self.engine)
+        # 시세 티커는 utils 의 5분 캐시 + 서킷 브레이커를 그대로 사용 (데이터 버전과 별개로 바뀜)
+        quotes = get_market_data()
+        current = self.snapshot
+        if current is not None and current.version == version:
+            if current.quotes == quotes: return False
+            self.snapshot = current.with_quotes(quotes)
+        else:
+            self.snapshot = ExportSnapshot(version, *self._compute(), quotes)
+        self.updated_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        print(f"♻️ 캐시 갱신: version={version} (종목 {len(self.snapshot.leaderboard)}개)")
+        return True
+
+    def _compute(self):
+        board = load_leaderboard(self.engine).frame
+        leaderboard = [
+            {"ranking": int(r["ranking"]), "id": int(r["id"]), "nickname": r["nickname"],
+             "curr_ma": round(float(r["curr_ma"]), 4), "diff": round(float(r["diff"]), 4)}
+            for r in board.to_dict("records")
+        ]
+        names = {row["id"]: row["nickname"] for row in leaderboard}
+
+        series, market_index = [], []
+        history = load_commit_history(self.engine)
+        if len(history.dates):
+            last_date = history.last_date
+            dates, user_ids, values = history.rolling_mean(window=7, start=last_date - np.timedelta64(SERIES_DAYS - 1, 'D'), end=last_date)
+            date_strs = [str(d) for d in dates]
+            for col, user_id in enumerate(user_ids):
+                nickname = names.get(int(user_id))
+                if nickname is None: continue
+                series.extend({"nickname": nickname, "date": date_strs[row], "ma7": round(float(values[row, col]), 4)}
+                              for row in range(len(dates)))
+            means = values.mean(axis=1) if values.shape[1] else np.zeros(len(dates))
+            market_index = [{"date": d, "index": round(float(v), 4)} for d, v in zip(date_strs, means)]
+        return leaderboard, series, market_index
+
+    def run_forever(self):
+        while True:
+            time.sleep(self.poll)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Refresh Error: {e}")
+
+# --- 2. HTTP 핸들러 ---
+class ExportHandler(BaseHTTPRequestHandler):
+    cache = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        snapshot = self.cache.snapshot
+        if snapshot is None:
+            return self._send_error(503, "cache warming up")
+        if url.path == "/healthz":
+            body = json.dumps({"version": snapshot.version, "updated_at": self.cache.updated_at}).encode()
+            return self._send(200, body, "application/json", cacheable=False)
+        if url.path not in ROUTES:
+            return self._send_error(404, "not found")
+
+        try:
+            params = parse_params(url.path, {k: v[-1] for k, v in parse_qs(url.query).items()})
+        except ValueError as e:
+            return self._send_error(400, str(e))
+
+        # 폴링 클라이언트: 본문을 만들기 전에 ETag 만으로 304 응답
+        etag = snapshot.etag(url.path, params)
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", None, etag=etag)
+        etag, body, content_type = snapshot.response(url.path, params)
+        self._send(200, body, content_type, etag=etag)
+
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({"error": message}).encode(), "application/json", cacheable=False)
+
+    def _send(self, status, body, content_type, etag=None, cacheable=True):
+        self.send_response(status)
+        if content_type: self.send_header("Content-Type", content_type)
+        if etag: self.send_header("ETag", etag)
+        self.send_header("Cache-Control", f"public, max-age={self.cache.poll}" if cacheable else "no-store")
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Commit Stock Market 리더보드 내보내기 API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--poll", type=int, default=30, help="데이터 버전 확인 주기(초) = Cache-Control max-age")
+    args = parser.parse_args()
+
+    engine = init_engine()
+    if engine is None:
+        raise SystemExit("DB 설정이 없습니다. secrets.toml 을 확인하세요.")
+    cache = ExportCache(engine, args.poll)
+    cache.refresh()
+    threading.Thread(target=cache.run_forever, daemon=True, name="export-refresh").start()
+
+    ExportHandler.cache = cache
+    server = ThreadingHTTPServer((args.host, args.port), ExportHandler)
+    print(f"📤 Export API: http://{args.host}:{args.port} (poll {args.poll}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
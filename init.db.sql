@@ -7,7 +7,8 @@ CREATE TABLE users (
     id INT AUTO_INCREMENT PRIMARY KEY,
     nickname VARCHAR(50) NOT NULL UNIQUE, -- 종목명
     repo_url VARCHAR(255) NOT NULL,       -- 백준 허브 레포 주소
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    synced_cycle BIGINT NOT NULL DEFAULT 0 -- 마지막으로 동기화한 워커 주기 (주기당 1회 수집 보장)
 );
 
 -- 3. 커밋(주가) 이력 테이블 생성
@@ -17,5 +18,61 @@ CREATE TABLE daily_commits (
     commit_date DATE NOT NULL,
     count INT DEFAULT 0,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-    UNIQUE KEY user_date_unique (user_id, commit_date) -- 중복 방지 핵심 설정
-);
\ No newline at end of file
+    UNIQUE KEY user_date_unique (user_id, commit_date), -- 중복 방지 핵심 설정
+    INDEX commit_date_idx (commit_date)                  -- 리더보드 최근 14일 조회용
+);
+
+-- 4. 동기화 워커 샤드 리스 (sync_worker.py)
+CREATE TABLE sync_leases (
+    shard_id INT PRIMARY KEY,               -- users.id % 샤드 수
+    worker_id VARCHAR(64),                  -- 현재 소유 워커 (NULL = 미할당)
+    lease_until BIGINT NOT NULL DEFAULT 0   -- 리스 만료 시각 (epoch 초)
+);
+
+-- 5. 동기화 워커 상태 (하트비트 + 처리량)
+CREATE TABLE sync_workers (
+    worker_id VARCHAR(64) PRIMARY KEY,
+    heartbeat_at BIGINT NOT NULL,           -- 마지막 하트비트 (epoch 초)
+    shards VARCHAR(255),                    -- 보유 샤드 목록
+    repos_synced INT NOT NULL DEFAULT 0,    -- 누적 수집 레포 수
+    repos_per_min DOUBLE NOT NULL DEFAULT 0 -- 최근 보고 구간 처리량
+);
+
+-- 6. 커밋 이벤트 로그 (append-only, daily_commits 는 새 커밋이 들어간 날짜만 여기서 다시 집계)
+CREATE TABLE commits (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    sha CHAR(40) NOT NULL,
+    author_date DATE NOT NULL,              -- 작성일 (UTC)
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    UNIQUE KEY user_sha_unique (user_id, sha), -- 같은 커밋 중복 기록 방지
+    INDEX user_date_idx (user_id, author_date) -- 구간 재집계용
+);
+
+-- 7. 동기화 실패 레포 재시도 큐 (지수 백오프 + dead-letter)
+CREATE TABLE sync_failures (
+    user_id INT PRIMARY KEY,
+    reason VARCHAR(255) NOT NULL,           -- not found / unauthorized / timeout ...
+    status_code INT,                        -- GitHub 응답 코드 (없으면 NULL)
+    attempts INT NOT NULL DEFAULT 0,        -- 연속 실패 횟수
+    next_attempt_at BIGINT NOT NULL DEFAULT 0, -- 다음 재시도 시각 (epoch 초)
+    dead TINYINT NOT NULL DEFAULT 0,        -- 1 = dead-letter (일반 동기화 제외)
+    last_failed_at BIGINT NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX due_idx (dead, next_attempt_at)
+);
+
+-- 8. 데이터 버전 카운터 (행 1개, 랭킹/내보내기 캐시 무효화용)
+--    daily_commits / users 를 바꾸는 쓰기가 같은 트랜잭션에서 1 증가 → 페이지는 PK 1행만 조회해 버전 확인
+CREATE TABLE data_version (
+    id TINYINT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO data_version (id, version) VALUES (1, 0);
+
+-- ※ 기존 DB 마이그레이션
+-- ALTER TABLE daily_commits ADD INDEX commit_date_idx (commit_date);
+-- ALTER TABLE users ADD COLUMN synced_cycle BIGINT NOT NULL DEFAULT 0;
+-- data_version 은 위 CREATE TABLE + INSERT 실행
+-- commits, sync_failures 테이블은 위 CREATE TABLE 만 실행 (commits: 유저별 첫 동기화 때 최근 31일 daily_commits 를 로그 기준으로 재집계)
+-- 리더보드는 윈도우 함수(ROW_NUMBER, COUNT OVER)를 사용하므로 MySQL 8.0 이상이 필요합니다.
\ No newline at end of file
@@ -0,0 +1,67 @@
+-- 내장 SQLite 백엔드용 스키마 (init.db.sql 과 동일한 구조)
+-- SQLiteStorage 가 프로세스마다 DB 파일별로 처음 연결할 때 실행하므로 모두 IF NOT EXISTS 로 작성
+-- 기존 테이블에 나중에 추가된 컬럼(users.synced_cycle 등)은 SQLiteStorage.ADDED_COLUMNS 에서 ALTER 로 보충
+
+-- 종목(유저) 테이블
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nickname VARCHAR(50) NOT NULL UNIQUE, -- 종목명
+    repo_url VARCHAR(255) NOT NULL,       -- 백준 허브 레포 주소
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    synced_cycle BIGINT NOT NULL DEFAULT 0 -- 마지막으로 동기화한 워커 주기 (주기당 1회 수집 보장)
+);
+
+-- 커밋(주가) 이력 테이블
+CREATE TABLE IF NOT EXISTS daily_commits (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    commit_date DATE NOT NULL,
+    count INTEGER DEFAULT 0,
+    CONSTRAINT user_date_unique UNIQUE (user_id, commit_date) -- 중복 방지 핵심 설정
+);
+CREATE INDEX IF NOT EXISTS commit_date_idx ON daily_commits (commit_date);
+
+-- 동기화 워커 샤드 리스 (sync_worker.py)
+CREATE TABLE IF NOT EXISTS sync_leases (
+    shard_id INTEGER PRIMARY KEY,             -- users.id % 샤드 수
+    worker_id VARCHAR(64),                    -- 현재 소유 워커 (NULL = 미할당)
+    lease_until BIGINT NOT NULL DEFAULT 0     -- 리스 만료 시각 (epoch 초)
+);
+
+-- 동기화 워커 상태 (하트비트 + 처리량)
+CREATE TABLE IF NOT EXISTS sync_workers (
+    worker_id VARCHAR(64) PRIMARY KEY,
+    heartbeat_at BIGINT NOT NULL,             -- 마지막 하트비트 (epoch 초)
+    shards VARCHAR(255),                      -- 보유 샤드 목록
+    repos_synced INTEGER NOT NULL DEFAULT 0,  -- 누적 수집 레포 수
+    repos_per_min DOUBLE NOT NULL DEFAULT 0   -- 최근 보고 구간 처리량
+);
+
+-- 커밋 이벤트 로그 (append-only)
+CREATE TABLE IF NOT EXISTS commits (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    sha CHAR(40) NOT NULL,
+    author_date DATE NOT NULL,                -- 작성일 (UTC)
+    CONSTRAINT user_sha_unique UNIQUE (user_id, sha) -- 같은 커밋 중복 기록 방지
+);
+CREATE INDEX IF NOT EXISTS user_date_idx ON commits (user_id, author_date);
+
+-- 동기화 실패 레포 재시도 큐 (지수 백오프 + dead-letter)
+CREATE TABLE IF NOT EXISTS sync_failures (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    reason VARCHAR(255) NOT NULL,             -- not found / unauthorized / timeout ...
+    status_code INTEGER,                      -- GitHub 응답 코드 (없으면 NULL)
+    attempts INTEGER NOT NULL DEFAULT 0,      -- 연속 실패 횟수
+    next_attempt_at BIGINT NOT NULL DEFAULT 0, -- 다음 재시도 시각 (epoch 초)
+    dead INTEGER NOT NULL DEFAULT 0,          -- 1 = dead-letter (일반 동기화 제외)
+    last_failed_at BIGINT NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS due_idx ON sync_failures (dead, next_attempt_at);
+
+-- 데이터 버전 카운터 (행 1개, daily_commits / users 를 바꾸는 쓰기마다 1 증가)
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0);
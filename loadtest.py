@@ -0,0 +1,278 @@
+"""동시 세션 부하 테스트 도구
+
+Home → 상장(listing) → Ranking → GeekNews 흐름을 N개의 가상 세션으로 동시에 실행하고
+페이지별 rerun 지연(p50/p95), rerun 당 DB 쿼리 수, rerun 당 외부 호출 수를 보고합니다.
+
+- 실행: Streamlit AppTest (헤드리스 스크립트 실행). AppTest 는 프로세스 전역 런타임을 쓰므로
+  세션마다 별도 프로세스에서 동시에 시작 (캐시 적중은 세션 안의 반복 rerun 으로 확인)
+- DB: 로컬 MySQL (운영 DB 와 분리된 전용 database) 또는 내장 SQLite 파일에 시드 데이터 생성
+- 외부 API: yfinance / GitHub / GeekNews 응답은 모두 스텁으로 대체
+
+예시)
+    python loadtest.py --sessions 20 --users 500 --mysql-user root --mysql-password pw
+    python loadtest.py --backend sqlite --sessions 20 --users 500
+"""
+import argparse
+import os
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pymysql
+import pymysql.cursors
+import requests
+import streamlit as st
+import yfinance as yf
+from streamlit.testing.v1 import AppTest
+
+from utils import SQLiteStorage
+
+SESSION_KEY = "_loadtest_session"
+PAGES = ["Home", "Listing", "Ranking", "GeekNews"]
+
+# --- 1. 세션별 계측 (DB 쿼리 / 외부 호출) ---
+_lock = threading.Lock()
+_counters = defaultdict(Counter)
+
+def _current_session():
+    # 스크립트 스레드 안에서만 세션 표식을 읽을 수 있음 (그 외 호출은 'unknown' 으로 집계)
+    try:
+        return st.session_state.get(SESSION_KEY, "unknown")
+    except Exception:
+        return "unknown"
+
+def _count(kind):
+    with _lock:
+        _counters[_current_session()][kind] += 1
+
+def _snapshot(session):
+    with _lock:
+        return Counter(_counters[session])
+
+# --- 2. 외부 API 스텁 ---
+class _StubResponse:
+    def __init__(self, status_code=200, payload=None, text=""):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = text
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} stub error")
+
+GEEKNEWS_HTML = "".join(
+    f'<div class="topic_row"><div class="topictitle"><a href="topic?id={i}">Stub news {i}</a></div>'
+    f'<div class="topicdesc">Stub description {i}</div><div class="topicinfo">{i} points</div></div>'
+    for i in range(1, 21)
+)
+
+def _stub_requests_get(url, *args, **kwargs):
+    _count("external")
+    if "api.github.com" in url:
+        rng = random.Random(url)
+        today = datetime.now(timezone.utc)
+        commits = [
+            {"sha": f"{rng.getrandbits(160):040x}",
+             "commit": {"author": {"date": (today - timedelta(days=rng.randint(0, 29))).strftime('%Y-%m-%dT%H:%M:%SZ')}}}
+            for _ in range(rng.randint(0, 60))
+        ]
+        return _StubResponse(200, commits)
+    if "news.hada.io" in url:
+        return _StubResponse(200, text=GEEKNEWS_HTML)
+    return _StubResponse(404, {})
+
+class _StubFastInfo:
+    def __init__(self, symbol):
+        rng = random.Random(symbol)
+        self.previous_close = rng.uniform(10, 1000)
+        self.last_price = self.previous_close * rng.uniform(0.95, 1.05)
+
+class _StubTickers:
+    def __init__(self, symbols):
+        _count("external")
+        self.tickers = {s: mock.Mock(fast_info=_StubFastInfo(s)) for s in symbols.split()}
+
+_original_execute = pymysql.cursors.Cursor.execute
+
+def _counting_execute(self, query, args=None):
+    _count("db")
+    return _original_execute(self, query, args)
+
+_original_sqlite_connect = SQLiteStorage.connect
+
+def _counting_sqlite_connect(self):
+    # sqlite3.Cursor 는 패치할 수 없으므로 trace 콜백으로 집계 (executemany 는 행 단위로 집계됨)
+    conn = _original_sqlite_connect(self)
+    conn.set_trace_callback(lambda stmt: None if stmt.lstrip().upper().startswith(("BEGIN", "COMMIT", "ROLLBACK", "PRAGMA", "CREATE")) else _count("db"))
+    return conn
+
+# --- 3. 시드 데이터 ---
+def _seed_rows(cursor, placeholder, num_users, days):
+    cursor.executemany(
+        f"INSERT INTO users (nickname, repo_url) VALUES ({placeholder}, {placeholder})",
+        [(f"seed_{i:05d}", f"https://github.com/loadtest/seed-{i}") for i in range(num_users)],
+    )
+    cursor.execute("SELECT id FROM users")
+    user_ids = [row[0] for row in cursor.fetchall()]
+    rng = random.Random(42)
+    today = datetime.now(timezone.utc).date()
+    rows = [
+        (uid, (today - timedelta(days=d)).strftime('%Y-%m-%d'), rng.choice([0, 0, 0, 1, 2, 3, 5, 8]))
+        for uid in user_ids for d in range(days)
+    ]
+    for i in range(0, len(rows), 5000):
+        cursor.executemany(f"INSERT INTO daily_commits (user_id, commit_date, count) VALUES ({placeholder}, {placeholder}, {placeholder})", rows[i:i + 5000])
+
+def seed_mysql(mysql_config, num_users, days):
+    db_name = mysql_config["database"]
+    server = pymysql.connect(**{k: v for k, v in mysql_config.items() if k != "database"})
+    with server.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{db_name}`")
+        cursor.execute(f"CREATE DATABASE `{db_name}`")
+    server.close()
+
+    with open("init.db.sql", encoding="utf-8") as f:
+        schema = f.read()
+    statements = [s.strip() for s in schema.split(";")]
+    statements = [s for s in statements if s and not s.upper().startswith(("CREATE DATABASE", "USE"))]
+
+    conn = pymysql.connect(**mysql_config)
+    with conn.cursor() as cursor:
+        for statement in statements:
+            lines = [l for l in statement.splitlines() if not l.strip().startswith("--")]
+            if "".join(lines).strip():
+                cursor.execute("\n".join(lines))
+        _seed_rows(cursor, "%s", num_users, days)
+    conn.commit()
+    conn.close()
+
+def seed_sqlite(path, num_users, days):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    conn = SQLiteStorage({"path": path}).connect()
+    _seed_rows(conn.cursor(), "?", num_users, days)
+    conn.commit()
+    conn.close()
+
+# --- 4. 가상 세션 ---
+def _timed_run(at, session, page, results, timeout):
+    before = _snapshot(session)
+    started = time.perf_counter()
+    at.run(timeout=timeout)
+    elapsed = time.perf_counter() - started
+    delta = _snapshot(session) - before
+    results.append({
+        "page": page,
+        "latency": elapsed,
+        "db": delta["db"],
+        "external": delta["external"],
+        "errors": len(at.exception),
+    })
+
+def run_session(index, secrets, reruns, timeout, barrier=None):
+    session = f"session-{index}"
+    results = []
+    at = AppTest.from_file("Home.py", default_timeout=timeout)
+    for section, values in secrets.items():
+        at.secrets[section] = values
+    at.session_state[SESSION_KEY] = session
+    if barrier is not None:
+        barrier.wait()
+
+    _timed_run(at, session, "Home", results, timeout)
+
+    # 상장: 1명 등록 후 제출 (Home 스크립트가 sync_missing_data 까지 실행)
+    at.number_input[0].set_value(1)
+    at.text_input(key="nick_0").input(f"lt_{index}_{uuid.uuid4().hex[:8]}")
+    at.text_input(key="repo_0").input(f"https://github.com/loadtest/listing-{index}")
+    next(b for b in at.button if b.label == "CONFIRM LISTING").click()
+    _timed_run(at, session, "Listing", results, timeout)
+
+    at.switch_page("pages/1-Ranking.py")
+    for _ in range(reruns):
+        _timed_run(at, session, "Ranking", results, timeout)
+
+    at.switch_page("pages/2-GEEKNEWS.py")
+    for _ in range(reruns):
+        _timed_run(at, session, "GeekNews", results, timeout)
+    return results
+
+def run_session_process(index, secrets, reruns, timeout, barrier):
+    # 스텁/계측 패치는 세션 프로세스 안에서 적용
+    with mock.patch.object(requests, "get", _stub_requests_get), \
+         mock.patch.object(yf, "Tickers", _StubTickers), \
+         mock.patch.object(pymysql.cursors.Cursor, "execute", _counting_execute), \
+         mock.patch.object(SQLiteStorage, "connect", _counting_sqlite_connect):
+        return run_session(index, secrets, reruns, timeout, barrier)
+
+# --- 5. 리포트 ---
+def _percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered: return 0.0
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+def print_report(all_results, sessions):
+    print(f"\n=== LOAD TEST REPORT ({sessions} sessions) ===")
+    print(f"{'PAGE':<10}{'RERUNS':>8}{'P50(ms)':>10}{'P95(ms)':>10}{'DB/RERUN':>10}{'EXT/RERUN':>11}{'ERRORS':>8}")
+    for page in PAGES:
+        rows = [r for r in all_results if r["page"] == page]
+        if not rows: continue
+        latencies = [r["latency"] * 1000 for r in rows]
+        print(f"{page:<10}{len(rows):>8}{_percentile(latencies, 50):>10.1f}{_percentile(latencies, 95):>10.1f}"
+              f"{statistics.mean(r['db'] for r in rows):>10.1f}{statistics.mean(r['external'] for r in rows):>11.1f}"
+              f"{sum(r['errors'] for r in rows):>8}")
+    # 세션마다 별도 프로세스 → st.cache_data / st.cache_resource 도 세션마다 따로 비어 있음
+    print("\n※ 한계: 세션별 프로세스로 실행되어 캐시를 공유하지 않습니다. 첫 rerun 은 모두 콜드 캐시이며,")
+    print("  하나의 서버 프로세스에서 여러 세션이 같은 캐시를 동시에 채우는 경합(stampede)이나 세션 간 캐시 적중은 측정되지 않습니다.")
+    print("  (반복 rerun 수치 = 같은 세션 안의 캐시 적중. 실서버 동시 접속은 streamlit run 서버 대상 별도 측정 필요)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Commit Stock Market 동시 세션 부하 테스트")
+    parser.add_argument("--sessions", type=int, default=10, help="동시 가상 세션 수")
+    parser.add_argument("--users", type=int, default=200, help="시드 유저(종목) 수")
+    parser.add_argument("--days", type=int, default=31, help="시드 커밋 이력 일수")
+    parser.add_argument("--reruns", type=int, default=2, help="Ranking/GeekNews 반복 rerun 횟수 (캐시 적중 확인)")
+    parser.add_argument("--timeout", type=float, default=120, help="rerun 당 타임아웃(초)")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql", help="저장소 백엔드")
+    parser.add_argument("--sqlite-path", default="loadtest.db", help="시드용 SQLite 파일 (매 실행마다 재생성)")
+    parser.add_argument("--mysql-host", default="127.0.0.1")
+    parser.add_argument("--mysql-port", type=int, default=3306)
+    parser.add_argument("--mysql-user", default="root")
+    parser.add_argument("--mysql-password", default="")
+    parser.add_argument("--mysql-database", default="commit_stock_loadtest", help="시드용 전용 DB (매 실행마다 재생성)")
+    args = parser.parse_args()
+
+    if args.backend == "sqlite":
+        print(f"🌱 시드 데이터 생성: 유저 {args.users}명 × {args.days}일 → {args.sqlite_path}")
+        seed_sqlite(args.sqlite_path, args.users, args.days)
+        secrets = {"storage": {"backend": "sqlite", "path": args.sqlite_path}, "github": {"token": "stub-token"}}
+    else:
+        mysql_config = {
+            "host": args.mysql_host, "port": args.mysql_port, "user": args.mysql_user,
+            "password": args.mysql_password, "database": args.mysql_database,
+        }
+        print(f"🌱 시드 데이터 생성: 유저 {args.users}명 × {args.days}일 → {args.mysql_database}")
+        seed_mysql(mysql_config, args.users, args.days)
+        secrets = {"mysql": mysql_config, "github": {"token": "stub-token"}}
+
+    with Manager() as manager, ProcessPoolExecutor(max_workers=args.sessions) as pool:
+        barrier = manager.Barrier(args.sessions)
+        futures = [pool.submit(run_session_process, i, secrets, args.reruns, args.timeout, barrier) for i in range(args.sessions)]
+        all_results = [r for f in futures for r in f.result()]
+
+    print_report(all_results, args.sessions)
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,11 @@
+import html
 import streamlit as st
-import pandas as pd
+import numpy as np
 import colorsys
-import yfinance as yf
-import pymysql
-from datetime import datetime
-from utils import init_connection, init_engine, sync_missing_data
-
-# --- 0. 시장 데이터 캐싱 함수 ---
-@st.cache_data(ttl=300)
-def get_market_data():
-    target_symbols = ['MSFT', 'NVDA', 'AAPL', 'GOOGL', 'TSLA', '005930.KS', '000660.KS', 'BTC-USD']
-    all_symbols = target_symbols + ['KRW=X']
-    data_list = []
-    try:
-        tickers = yf.Tickers(' '.join(all_symbols))
-        try: usd_krw_rate = tickers.tickers['KRW=X'].fast_info.last_price
-        except: usd_krw_rate = 1400.0
-        for symbol in target_symbols:
-            try:
-                info = tickers.tickers[symbol].fast_info
-                price, prev_close = info.last_price, info.previous_close
-                change_pct = ((price - prev_close) / prev_close) * 100
-                if '.KS' in symbol: price = price / usd_krw_rate
-                if symbol == '005930.KS': name = "SAMSUNG"
-                elif symbol == '000660.KS': name = "SK HYNIX"
-                else: name = symbol.replace('-USD', '')
-                price_str = f"{price:,.2f}"
-                data_list.append({"name": name, "price": price_str, "change": change_pct})
-            except: continue
-    except:
-        data_list = [{"name": "SYSTEM", "price": "ONLINE", "change": 0.0}]
-    return data_list
+from urllib.parse import quote
+from utils import (init_connection, init_engine, sync_missing_data, sync_page_budget, sync_is_fresh, get_user_rank_cached,
+                   render_ticker, get_data_version, get_leaderboard_page_cached, get_commit_history_cached,
+                   RANKING_SYMBOLS, LEADERBOARD_PAGE_SIZE)
 
 # DB 연결 및 엔진 초기화
 conn = init_connection()
@@ -44,12 +19,18 @@ def get_user_color(user_id):
     r, g, b = colorsys.hls_to_rgb(h, l, s)
     return '#%02x%02x%02x' % (int(r*255), int(g*255), int(b*255))
 
+# 종목 상세 페이지(pages/3-Asset.py) 링크
+def asset_link(nickname):
+    return f'<a href="Asset?asset={quote(nickname)}" target="_self" style="color:white; text-decoration:none;">{html.escape(nickname)}</a>'
+
 # --- 2. 페이지 구성 ---
 st.set_page_config(page_title="Commit Stock Market - Ranking", page_icon="https://images.therich.io/images/logo/kr/316140.png?timestamp=1748519881", layout="wide")
 
+# 최근(부팅 워밍업 포함) 전체 동기화가 있었다면 세션 시작 동기화는 생략
 if 'initialized' not in st.session_state:
-    with st.spinner("최신 데이터 수신 중..."):
-        sync_missing_data(conn)
+    if not sync_is_fresh():
+        with st.spinner("최신 데이터 수신 중..."):
+            sync_missing_data(conn, budget=sync_page_budget())
     st.session_state['initialized'] = True
 
 # --- 3. 커스텀 CSS ---
@@ -101,7 +82,7 @@ with st.sidebar:
     st.markdown("### Market Admin")
     if st.button("Sync Market Data", use_container_width=True):
         with st.spinner("Updating..."):
-            sync_missing_data(conn)
+            sync_missing_data(conn, budget=sync_page_budget())
         st.rerun()
     st.divider()
     if st.button("Go to Home", use_container_width=True):
@@ -109,48 +90,28 @@ with st.sidebar:
     if st.button("Go to GeekNews", use_container_width=True):
         st.switch_page("pages/2-GEEKNEWS.py")
 
-# --- 티커 렌더링 ---
-market_data = get_market_data()
-ticker_html_content = ""
-for item in market_data:
-    if item['change'] > 0: c, a, s = "up", "▲", "+"
-    elif item['change'] < 0: c, a, s = "down", "▼", ""
-    else: c, a, s = "flat", "-", ""
-    ticker_html_content += f'<span class="ticker-item">{item["name"]}: ${item["price"]} <span class="{c}">{a} {s}{item["change"]:.2f}%</span></span>'
-ticker_html_content += '<span class="ticker-item">GITHUB: <span class="up">OPERATIONAL</span></span><span class="ticker-item">MARKET: <span class="up">OPEN 24/7</span></span>'
-st.markdown(f'<div class="ticker-wrap"><div class="ticker">{ticker_html_content}</div></div>', unsafe_allow_html=True)
+# --- 티커 렌더링 (자체 주기로 갱신되는 fragment) ---
+render_ticker(RANKING_SYMBOLS, (("GITHUB", "OPERATIONAL", "up"), ("MARKET", "OPEN 24/7", "up")))
 
 st.markdown('<div class="main-title">WEEKLY RANKING</div>', unsafe_allow_html=True)
 
 # --- 4. 랭킹 및 차트 섹션 ---
-try:
-    # 핵심 수정: engine을 사용하여 read_sql 호출 (Warning 해결)
-    query = "SELECT u.id, u.nickname, d.commit_date, d.count FROM daily_commits d JOIN users u ON d.user_id = u.id ORDER BY d.commit_date ASC"
-    df = pd.read_sql(query, engine)
-    
-    if not df.empty:
-        df['commit_date'] = pd.to_datetime(df['commit_date'])
-        chart_data = df.pivot(index='commit_date', columns='nickname', values='count').fillna(0)
-        moving_avg_data = chart_data.rolling(window=7, min_periods=1).mean()
-        last_date = chart_data.index.max()
-        filtered_chart_data = moving_avg_data.loc[last_date - pd.Timedelta(days=14):last_date]
-        
-        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
-            cursor.execute("SELECT id, nickname FROM users")
-            users_info = cursor.fetchall()
-            user_to_id = {u['nickname']: u['id'] for u in users_info}
-            
-            tile_list = []
-            for user in users_info:
-                cursor.execute("SELECT count FROM daily_commits WHERE user_id = %s ORDER BY commit_date DESC LIMIT 14", (user['id'],))
-                rows = cursor.fetchall()
-                counts = [row['count'] for row in rows] + [0]*14
-                curr_ma = sum(counts[:7]) / 7
-                diff = curr_ma - (sum(counts[7:14]) / 7)
-                tile_list.append({'id': user['id'], 'nickname': user['nickname'], 'curr_ma': curr_ma, 'diff': diff})
-
-        tile_list.sort(key=lambda x: x['curr_ma'], reverse=True)
-        top_10 = tile_list[:10]
+# 1분마다 데이터 버전만 확인하고, 버전이 같으면 캐시된 결과로 다시 그림
+@st.fragment(run_every=60)
+def ranking_board():
+    try:
+        data_version = get_data_version(engine)
+        # pivot 대신 int16 이력 컨테이너 사용 (메모리 예산은 utils.CommitHistory 참고)
+        history = get_commit_history_cached(engine, data_version)
+        if not len(history.dates): return
+
+        last_date = history.last_date
+        window_start = last_date - np.timedelta64(14, 'D')
+
+        # 상위 10명: 리더보드 1페이지 (한 번의 쿼리)
+        top_df, _ = get_leaderboard_page_cached(engine, data_version, page=1, page_size=10)
+        top_10 = top_df.to_dict('records')
+        user_to_id = {t['nickname']: t['id'] for t in top_10}
 
         # 포디움 UI
         p_col = st.columns([1, 1, 1])
@@ -179,21 +140,92 @@ try:
         c1, c2 = st.columns([2.2, 1])
         with c1:
             st.markdown('<p style="color:#5edfff; font-weight:700; margin-bottom:10px;">ASSET PERFORMANCE INDEX (7D MA)</p>', unsafe_allow_html=True)
-            names = [t['nickname'] for t in top_10]
-            display_chart_data = filtered_chart_data[names].copy()
+            chart_ids = [t['id'] for t in top_10]
+            ma_dates, ma_ids, ma_values = history.rolling_mean(window=7, start=window_start, end=last_date, user_ids=chart_ids)
+            display_chart_data = history.to_frame(ma_values, ma_dates, ma_ids, names={t['id']: t['nickname'] for t in top_10})
+            names = list(display_chart_data.columns)
             final_colors = [get_user_color(user_to_id[name]) for name in names]
-            display_chart_data.columns = [f"{'👑' if i==0 else '🥈' if i==1 else '🥉' if i==2 else ''} {n}" for i, n in enumerate(names)]
+            # 이력이 없는 유저는 to_frame 에서 빠지므로 메달은 열 순서가 아니라 top_10 안의 순위로 정함
+            medals = {t['nickname']: ('👑', '🥈', '🥉')[i] for i, t in enumerate(top_10[:3])}
+            display_chart_data.columns = [f"{medals.get(n, '')} {n}" for n in names]
             st.line_chart(display_chart_data, color=final_colors, height=380)
-            
+
         with c2:
             st.markdown('<p style="color:#5edfff; font-weight:700; margin-bottom:10px;">MARKET QUOTES</p>', unsafe_allow_html=True)
             for i, s in enumerate(top_10[3:]):
                 c = "#3fb950" if s['diff'] > 0 else "#ff6e6e" if s['diff'] < 0 else "#ffffff"
                 st.markdown(f"""
                     <div class="rank-card" style="border-left: 5px solid {get_user_color(s['id'])};">
-                        <span style="color:white; font-weight:600;">{i+4}. {s['nickname']}</span>
+                        <span style="color:white; font-weight:600;">{i+4}. {asset_link(s['nickname'])}</span>
                         <span style="color:{c}; font-weight:bold; font-family: 'Roboto Mono', monospace;">{s['curr_ma']:.2f} ({s['diff']:+.2f})</span>
                     </div>
                 """, unsafe_allow_html=True)
-except Exception as e:
-    st.error(f"Error: {e}")
\ No newline at end of file
+    except Exception as e:
+        st.error(f"Error: {e}")
+
+# --- 5. 전체 리더보드 (페이지네이션 + 검색) ---
+# 검색/페이지 이동 위젯은 이 fragment 안에서만 rerun 을 일으킴
+PAGE_SIZE = LEADERBOARD_PAGE_SIZE
+
+def reset_leaderboard_page():
+    st.session_state['lb_page'] = 1
+    st.session_state['lb_highlight'] = None
+
+# 콜백은 위젯 생성 전에 실행되므로 검색어/페이지 상태를 안전하게 바꿀 수 있음
+def jump_to_my_rank():
+    my_nickname = st.session_state.get('lb_me', "").strip()
+    my_rank = get_user_rank_cached(engine, get_data_version(engine), my_nickname) if my_nickname else None
+    if my_rank is None:
+        st.toast("해당 종목을 찾을 수 없습니다.", icon="🚨")
+        return
+    st.session_state['lb_search'] = ""
+    st.session_state['lb_page'] = (my_rank - 1) // PAGE_SIZE + 1
+    st.session_state['lb_highlight'] = my_nickname.lower()
+
+def move_leaderboard_page(step):
+    st.session_state['lb_page'] = st.session_state.get('lb_page', 1) + step
+
+@st.fragment
+def full_leaderboard():
+    try:
+        st.divider()
+        st.markdown('<p style="color:#5edfff; font-weight:700; margin-bottom:10px;">FULL LEADERBOARD</p>', unsafe_allow_html=True)
+        s1, s2, s3 = st.columns([2, 2, 1])
+        with s1:
+            search_prefix = st.text_input("Search", key="lb_search", placeholder="Nickname prefix", label_visibility="collapsed", on_change=reset_leaderboard_page)
+        with s2:
+            st.text_input("My asset", key="lb_me", placeholder="Jump to my rank (nickname)", label_visibility="collapsed")
+        with s3:
+            st.button("JUMP", use_container_width=True, on_click=jump_to_my_rank)
+
+        data_version = get_data_version(engine)
+        page = st.session_state.get('lb_page', 1)
+        page_df, page_total = get_leaderboard_page_cached(engine, data_version, page=page, page_size=PAGE_SIZE, prefix=search_prefix)
+        last_page = max(1, (page_total + PAGE_SIZE - 1) // PAGE_SIZE)
+        if page > last_page:
+            page = st.session_state['lb_page'] = last_page
+            page_df, page_total = get_leaderboard_page_cached(engine, data_version, page=page, page_size=PAGE_SIZE, prefix=search_prefix)
+
+        highlight = st.session_state.get('lb_highlight')
+        for s in page_df.to_dict('records'):
+            c = "#3fb950" if s['diff'] > 0 else "#ff6e6e" if s['diff'] < 0 else "#ffffff"
+            border = "border-color:#ffd700;" if s['nickname'].lower() == highlight else ""
+            st.markdown(f"""
+                <div class="rank-card" style="border-left: 5px solid {get_user_color(s['id'])}; {border}">
+                    <span style="color:white; font-weight:600;">{s['ranking']}. {asset_link(s['nickname'])}</span>
+                    <span style="color:{c}; font-weight:bold; font-family: 'Roboto Mono', monospace;">{s['curr_ma']:.2f} ({s['diff']:+.2f})</span>
+                </div>
+            """, unsafe_allow_html=True)
+
+        n1, n2, n3 = st.columns([1, 2, 1])
+        with n1:
+            st.button("◀ PREV", use_container_width=True, disabled=page <= 1, on_click=move_leaderboard_page, args=(-1,))
+        with n2:
+            st.markdown(f'<p style="text-align:center; color:#8b949e; font-family: Roboto Mono, monospace;">PAGE {page} / {last_page} · {page_total} ASSETS</p>', unsafe_allow_html=True)
+        with n3:
+            st.button("NEXT ▶", use_container_width=True, disabled=page >= last_page, on_click=move_leaderboard_page, args=(1,))
+    except Exception as e:
+        st.error(f"Error: {e}")
+
+ranking_board()
+full_leaderboard()
@@ -1,30 +1,6 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
-from urllib.parse import urljoin
-import re
-import yfinance as yf
-
-
-
-# --- 0. 시장 데이터 캐싱 (티커용) ---
-@st.cache_data(ttl=300)
-def get_market_data():
-    symbols = ['MSFT', 'NVDA', 'AAPL', 'BTC-USD']
-    data_list = []
-    try:
-        tickers = yf.Tickers(' '.join(symbols))
-        for symbol in symbols:
-            info = tickers.tickers[symbol].fast_info
-            price = info.last_price
-            prev_close = info.previous_close
-            change_pct = ((price - prev_close) / prev_close) * 100
-            name = symbol.replace('-USD', '')
-            data_list.append({"name": name, "price": f"{price:,.2f}", "change": change_pct})
-    except Exception:
-        data_list = [{"name": "SYSTEM", "price": "ONLINE", "change": 0.0}]
-    return data_list
+from utils import render_ticker, get_cleaned_geeknews
 
 # --- 페이지 설정 ---
 st.set_page_config(page_title="Commit Stock Market", page_icon="https://images.therich.io/images/logo/kr/316140.png?timestamp=1748519881", layout="wide")
@@ -175,100 +151,58 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- 뉴스 크롤링 로직 ---
-@st.cache_data(ttl=600)
-def get_cleaned_geeknews():
-    base_url = "https://news.hada.io/"
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    try:
-        response = requests.get(base_url, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        items = []
-        for topic in soup.select('.topic_row')[:20]:
-            title_tag = topic.select_one('.topictitle a')
-            if not title_tag: continue
-            
-            title = title_tag.text.strip()
-            link = urljoin(base_url, title_tag['href'])
-            
-            desc_area = topic.select_one('.topicdesc')
-            if desc_area:
-                for extra in desc_area.find_all(['div', 'script', 'style', 'br']):
-                    extra.decompose()
-                desc_text = desc_area.get_text(separator=" ").strip()
-                desc_text = re.sub(r'#+', '', desc_text)
-            else:
-                desc_text = ""
-            
-            meta_text = topic.select_one('.topicinfo').text.strip() if topic.select_one('.topicinfo') else ""
-            items.append({'title': title, 'link': link, 'desc': desc_text, 'meta': meta_text})
-        return items
-    except:
-        return []
-
 with st.sidebar:
     if st.button("Go to Home", use_container_width=True):
         st.switch_page("Home.py")
     if st.button("Go to Ranking", use_container_width=True):
         st.switch_page("pages/1-Ranking.py")
 
-# --- 티커 렌더링 ---
-market_data = get_market_data()
-ticker_html_content = ""
-for item in market_data:
-    if item['change'] > 0: c, a, s = "up", "▲", "+"
-    elif item['change'] < 0: c, a, s = "down", "▼", ""
-    else: c, a, s = "flat", "-", ""
-    ticker_html_content += f'<span class="ticker-item">{item["name"]}: ${item["price"]} <span class="{c}">{a} {s}{item["change"]:.2f}%</span></span>'
-
-st.markdown(f"""
-<div class="ticker-wrap">
-    <div class="ticker">
-        {ticker_html_content}
-        <span class="ticker-item">NEWS: <span class="up">LIVE FEED</span></span>
-        <span class="ticker-item">SOURCE: GEEKNEWS</span>
-    </div>
-</div>
-""", unsafe_allow_html=True)
+# --- 티커 렌더링 (자체 주기로 갱신되는 fragment) ---
+render_ticker(extra_items=(("NEWS", "LIVE FEED", "up"), ("SOURCE", "GEEKNEWS", None)))
 
 # --- 메인 레이아웃 ---
 st.markdown('<div class="main-title">GEEKNEWS TOP 20</div>', unsafe_allow_html=True)
 
-news_list = get_cleaned_geeknews()
-
-if news_list:
-    # 중앙 정렬을 위한 컨테이너 칼럼
-    _, mid_col, _ = st.columns([1, 10, 1])
-    with mid_col:
-        for i in range(0, len(news_list), 2):
-            cols = st.columns(2)
+# 뉴스 그리드: 크롤링 캐시 주기(10분)마다 이 영역만 갱신
+@st.fragment(run_every=600)
+def news_grid():
+    news_list = get_cleaned_geeknews()
+
+    if news_list:
+        # 중앙 정렬을 위한 컨테이너 칼럼
+        _, mid_col, _ = st.columns([1, 10, 1])
+        with mid_col:
+            for i in range(0, len(news_list), 2):
+                cols = st.columns(2)
             
-            # 좌측 카드 (i + 1위)
-            with cols[0]:
-                n = news_list[i]
-                st.markdown(f"""
-                    <div class="news-card">
-                        <div class="rank-badge">RANK {i+1:02d}</div>
-                        <div class="news-meta">{n['meta']}</div>
-                        <a href="{n['link']}" target="_blank" class="news-title">{n['title']}</a>
-                        <div class="news-desc">{n['desc']}</div>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-            # 우측 카드 (i + 2위)
-            if i + 1 < len(news_list):
-                with cols[1]:
-                    n = news_list[i+1]
+                # 좌측 카드 (i + 1위)
+                with cols[0]:
+                    n = news_list[i]
                     st.markdown(f"""
                         <div class="news-card">
-                            <div class="rank-badge">RANK {i+2:02d}</div>
+                            <div class="rank-badge">RANK {i+1:02d}</div>
                             <div class="news-meta">{n['meta']}</div>
                             <a href="{n['link']}" target="_blank" class="news-title">{n['title']}</a>
                             <div class="news-desc">{n['desc']}</div>
                         </div>
                     """, unsafe_allow_html=True)
-else:
-    st.info("데이터를 동기화하는 중입니다...")
+                
+                # 우측 카드 (i + 2위)
+                if i + 1 < len(news_list):
+                    with cols[1]:
+                        n = news_list[i+1]
+                        st.markdown(f"""
+                            <div class="news-card">
+                                <div class="rank-badge">RANK {i+2:02d}</div>
+                                <div class="news-meta">{n['meta']}</div>
+                                <a href="{n['link']}" target="_blank" class="news-title">{n['title']}</a>
+                                <div class="news-desc">{n['desc']}</div>
+                            </div>
+                        """, unsafe_allow_html=True)
+    else:
+        st.info("데이터를 동기화하는 중입니다...")
+
+news_grid()
 
 st.markdown("<br><br>", unsafe_allow_html=True)
 st.divider()
@@ -0,0 +1,131 @@
+import html
+import streamlit as st
+import numpy as np
+import pandas as pd
+from utils import (init_engine, render_ticker, get_data_version, get_asset, get_user_rank_cached,
+                   load_user_history, downsample_series, CHART_MAX_POINTS)
+
+# --- 1. 페이지 구성 ---
+st.set_page_config(page_title="Commit Stock Market - Asset", page_icon="https://images.therich.io/images/logo/kr/316140.png?timestamp=1748519881", layout="wide")
+
+engine = init_engine()
+
+# --- 2. 커스텀 CSS (Ranking 컨셉 이식) ---
+st.markdown("""
+<style>
+    [data-testid="stAppViewContainer"] {
+        background: linear-gradient(-45deg, #02040a, #0d1117, #010409);
+        background-size: 400% 400%;
+        animation: gradientBG 15s ease infinite;
+    }
+    @keyframes gradientBG {
+        0% { background-position: 0% 50%; }
+        50% { background-position: 100% 50%; }
+        100% { background-position: 0% 50%; }
+    }
+    [data-testid="stHeader"] { background-color: transparent !important; }
+    .ticker-wrap {
+        position: fixed; top: 0; left: 0; width: 100%; overflow: hidden; height: 2.0rem;
+        background-color: #000000; border-bottom: 1px solid #06b6d4;
+        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.5); padding-left: 100%; box-sizing: content-box; z-index: 9999;
+    }
+    .ticker {
+        display: inline-block; height: 2.0rem; line-height: 2.0rem; white-space: nowrap;
+        padding-right: 100%; box-sizing: content-box; animation: ticker 50s linear infinite;
+    }
+    .ticker-item { display: inline-block; padding: 0 2rem; font-size: 0.9rem; color: #ffffff; font-weight: 600; font-family: 'Roboto Mono', monospace; }
+    .up { color: #3fb950; font-weight: 800; } 
+    .down { color: #ff6e6e; font-weight: 800; } 
+    .flat { color: #8b949e; }
+    @keyframes ticker { 0% { transform: translate3d(0, 0, 0); } 100% { transform: translate3d(-100%, 0, 0); } }
+    .main-title {
+        font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif; font-weight: 800; font-size: 3rem;
+        margin-top: 40px; margin-bottom: 20px; text-align: center;
+        background: linear-gradient(to right, #FFFFFF 0%, #FFFFFF 40%, #5edfff 50%, #FFFFFF 60%, #FFFFFF 100%);
+        background-size: 200% auto; background-clip: text; -webkit-background-clip: text; -webkit-text-fill-color: transparent;
+        animation: shine 5s linear infinite;
+    }
+    @keyframes shine { to { background-position: 200% center; } }
+    .rank-card {
+        background: rgba(30, 41, 59, 0.7); backdrop-filter: blur(10px); border: 1px solid rgba(148, 163, 184, 0.2);
+        border-radius: 8px; margin-bottom: 8px; display: flex; justify-content: space-between;
+        align-items: center; height: 48px; padding: 0 20px; transition: all 0.3s ease;
+    }
+    .rank-card:hover { border-color: #06b6d4; background: rgba(30, 41, 59, 0.9); }
+    .asset-sub { text-align: center; color: #8b949e; font-family: 'Roboto Mono', monospace; margin-top: -10px; margin-bottom: 20px; }
+    .asset-sub a { color: #5edfff !important; text-decoration: none; }
+</style>
+""", unsafe_allow_html=True)
+
+with st.sidebar:
+    if st.button("Go to Home", use_container_width=True):
+        st.switch_page("Home.py")
+    if st.button("Go to Ranking", use_container_width=True):
+        st.switch_page("pages/1-Ranking.py")
+    if st.button("Go to GeekNews", use_container_width=True):
+        st.switch_page("pages/2-GEEKNEWS.py")
+
+# --- 티커 렌더링 (자체 주기로 갱신되는 fragment) ---
+render_ticker(extra_items=(("GITHUB", "OPERATIONAL", "up"), ("MARKET", "OPEN 24/7", "up")))
+
+# --- 3. 종목 선택 (?asset=닉네임) ---
+nickname = st.query_params.get("asset", "")
+searched = st.text_input("Asset", value=nickname, placeholder="Asset nickname", label_visibility="collapsed")
+if searched.strip() and searched.strip() != nickname:
+    st.query_params["asset"] = searched.strip()
+    st.rerun()
+
+asset = get_asset(engine, nickname)
+if not nickname:
+    st.info("조회할 종목의 닉네임을 입력하세요.")
+    st.stop()
+if asset is None:
+    st.error(f"'{nickname}' 종목을 찾을 수 없습니다.")
+    st.stop()
+
+# 닉네임 / 레포 주소는 사용자 입력이므로 이스케이프하고, 링크는 http(s) 주소만 허용
+repo_url = asset["repo_url"].strip()
+repo_html = html.escape(repo_url)
+if repo_url.lower().startswith(("https://", "http://")):
+    repo_html = f'<a href="{repo_html}" target="_blank" rel="noopener noreferrer">{repo_html}</a>'
+st.markdown(f'<div class="main-title">{html.escape(asset["nickname"])}</div>', unsafe_allow_html=True)
+st.markdown(f'<div class="asset-sub">{repo_html}</div>', unsafe_allow_html=True)
+
+# --- 4. 차트 섹션 ---
+# 보기 구간을 넓히면(줌 아웃) 필요한 90일 chunk 만 추가로 읽고, 화면에는 최대 CHART_MAX_POINTS 개 점만 보냄
+RANGES = {"1M": 30, "3M": 90, "6M": 180, "1Y": 365, "2Y": 730, "ALL": None}
+
+@st.fragment
+def asset_chart():
+    if asset['last_date'] is None:
+        st.info("아직 수집된 커밋 이력이 없습니다.")
+        return
+    data_version = get_data_version(engine)
+    last_date = pd.Timestamp(asset['last_date'])
+    first_date = pd.Timestamp(asset['first_date'])
+
+    range_key = st.segmented_control("RANGE", list(RANGES), default="3M", key="asset_range", label_visibility="collapsed") or "3M"
+    days = RANGES[range_key]
+    start = first_date if days is None else max(first_date, last_date - pd.Timedelta(days=days - 1))
+
+    # 7D MA 가 구간 시작에서 끊기지 않도록 6일 앞부터 읽음
+    daily = load_user_history(engine, asset['id'], start - pd.Timedelta(days=6), last_date, data_version)
+    moving_avg = daily.astype(np.float32).rolling(window=7, min_periods=1).mean().loc[start:]
+    daily = daily.loc[start:]
+
+    curr_ma = float(moving_avg.iloc[-1])
+    prev_ma = float(moving_avg.iloc[-8]) if len(moving_avg) > 7 else 0.0
+    rank = get_user_rank_cached(engine, data_version, asset['nickname'])
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("RANK", f"#{rank}" if rank else "-")
+    m2.metric("7D MA", f"{curr_ma:.2f}", f"{curr_ma - prev_ma:+.2f}")
+    m3.metric(f"COMMITS ({range_key})", f"{int(daily.sum()):,}")
+    m4.metric("ACTIVE DAYS", f"{int((daily > 0).sum()):,} / {len(daily):,}")
+
+    st.markdown('<p style="color:#5edfff; font-weight:700; margin-bottom:10px;">ASSET PERFORMANCE INDEX (7D MA)</p>', unsafe_allow_html=True)
+    st.line_chart(downsample_series(moving_avg, CHART_MAX_POINTS).rename("7D MA"), height=320)
+    st.markdown('<p style="color:#5edfff; font-weight:700; margin-bottom:10px;">DAILY COMMITS</p>', unsafe_allow_html=True)
+    st.line_chart(downsample_series(daily, CHART_MAX_POINTS).rename("COMMITS"), height=220)
+    st.caption(f"{len(daily):,} days · chart points ≤ {CHART_MAX_POINTS} (LTTB)")
+
+asset_chart()
@@ -0,0 +1,163 @@
+"""부팅 워밍업 런처
+
+배포/재시작 직후 첫 방문자가 시세·뉴스 수집, 전체 이력 read_sql, 세션 시작 동기화를 모두 떠안지 않도록
+같은 프로세스에서 캐시를 미리 채운 뒤 Streamlit 서버를 띄웁니다.
+서버는 워밍업이 끝난 뒤에야 포트를 열기 때문에 /_stcore/health 도 그때부터 ok 를 돌려줍니다.
+
+- market  : 티커 시세 (Home/GeekNews/Asset 기본 심볼 + Ranking 심볼)
+- news    : GeekNews 목록
+- sync    : 전체 동기화 1회 (--no-sync 로 생략). 이후 SYNC_FRESH_SECONDS 동안 세션 시작 동기화 생략
+- ranking : 데이터 버전, 커밋 이력(CommitHistory), 리더보드 상위 10명 / 1페이지
+- snapshot: [warmup] snapshot_dir 설정 시 이력 Parquet 스냅샷 (같은 버전이면 다음 부팅에 재사용)
+
+secrets.toml 예시)
+    [warmup]
+    snapshot_dir = ".snapshot"
+
+실행)
+    python serve.py --port 8501     # 워밍업 후 서버 시작
+    python serve.py --check         # 준비 상태 조회 (준비됨: 종료 코드 0)
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import requests
+import streamlit as st
+
+from utils import (init_connection, init_engine, sync_missing_data, get_market_data, get_cleaned_geeknews,
+                   get_data_version, get_commit_history_cached, get_leaderboard_page_cached, history_snapshot_path,
+                   external_status, TICKER_SYMBOLS, RANKING_SYMBOLS, MARKET_FALLBACK, LEADERBOARD_PAGE_SIZE)
+
+STATUS_FILE = os.path.join(".streamlit", "warmup_status.json")
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def write_status(status):
+    os.makedirs(os.path.dirname(STATUS_FILE), exist_ok=True)
+    with open(STATUS_FILE + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(status, f, ensure_ascii=False, indent=2)
+    os.replace(STATUS_FILE + ".tmp", STATUS_FILE)
+
+# --- 1. 워밍업 단계 ---
+# 각 단계는 (warm 여부, 설명) 을 반환. 페이지와 같은 인자 형태로 호출해야 같은 캐시 키가 채워짐
+def warm_market():
+    results = [get_market_data(tuple(TICKER_SYMBOLS)), get_market_data(RANKING_SYMBOLS)]
+    fallback = sum(1 for r in results if r == MARKET_FALLBACK)
+    return fallback == 0, f"{len(results) - fallback}/{len(results)} symbol sets"
+
+def warm_news():
+    news = get_cleaned_geeknews()
+    return bool(news), f"{len(news)} items"
+
+def warm_sync():
+    conn = init_connection()
+    if not conn: return False, "no database"
+    updated = sync_missing_data(conn)
+    return True, f"{updated} repos synced"
+
+def warm_ranking():
+    engine = init_engine()
+    if engine is None: return False, "no database"
+    data_version = get_data_version(engine)
+    history = get_commit_history_cached(engine, data_version)
+    get_leaderboard_page_cached(engine, data_version, page=1, page_size=10)
+    get_leaderboard_page_cached(engine, data_version, page=1, page_size=LEADERBOARD_PAGE_SIZE, prefix="")
+    return True, f"version {data_version}, {history.counts.shape[1]} users × {len(history.dates)} days"
+
+def warm_snapshot():
+    snapshot_dir = st.secrets.get("warmup", {}).get("snapshot_dir")
+    if not snapshot_dir: return None, "disabled"
+    engine = init_engine()
+    if engine is None: return False, "no database"
+    path = history_snapshot_path(snapshot_dir, get_data_version(engine))
+    return os.path.exists(path), path
+
+def run_warmup(port, sync=True):
+    steps = [("market", warm_market), ("news", warm_news)]
+    if sync:
+        steps.append(("sync", warm_sync))
+    # 동기화로 데이터 버전이 바뀔 수 있으므로 랭킹/스냅샷은 동기화 뒤에 채움
+    steps += [("ranking", warm_ranking), ("snapshot", warm_snapshot)]
+
+    status = {"pid": os.getpid(), "port": port, "started_at": _now(), "ready": False, "caches": {}}
+    write_status(status)
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            warm, detail = step()
+        except Exception as e:
+            warm, detail = False, f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - started
+        status["caches"][name] = {"warm": warm, "detail": detail, "seconds": round(elapsed, 2)}
+        print(f"{'🔥' if warm else '❄️'} {name:<9}{elapsed:6.2f}s  {detail}")
+        write_status(status)
+
+    # 일부 캐시가 차지 않아도(외부 장애 등) 서버는 띄움. 어떤 캐시가 비었는지는 --check 로 확인
+    status["external"] = external_status()
+    status["ready"] = True
+    status["ready_at"] = _now()
+    write_status(status)
+    return status
+
+# --- 2. 준비 상태 조회 ---
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def check_ready():
+    if not os.path.exists(STATUS_FILE):
+        print("NOT READY: 워밍업 기록이 없습니다.")
+        return 1
+    with open(STATUS_FILE, encoding="utf-8") as f:
+        status = json.load(f)
+
+    alive = _process_alive(status["pid"])
+    try:
+        healthy = requests.get(f"http://localhost:{status['port']}/_stcore/health", timeout=2).status_code == 200
+    except requests.RequestException:
+        healthy = False
+
+    print(f"{'CACHE':<10}{'WARM':>6}{'SEC':>8}  DETAIL")
+    for name, cache in status["caches"].items():
+        warm = {True: "yes", False: "no", None: "-"}[cache["warm"]]
+        print(f"{name:<10}{warm:>6}{cache['seconds']:>8.2f}  {cache['detail']}")
+    for name, breaker in status.get("external", {}).items():
+        print(f"circuit {name}: {breaker['state']} (failures {breaker['failures']})")
+
+    ready = status["ready"] and alive and healthy
+    print(f"\n{'READY' if ready else 'NOT READY'} (warmup={'done' if status['ready'] else 'running'}, process={'alive' if alive else 'dead'}, server={'up' if healthy else 'down'})")
+    return 0 if ready else 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Commit Stock Market 부팅 워밍업 런처")
+    parser.add_argument("--check", action="store_true", help="준비 상태 조회 후 종료 (준비됨: 0)")
+    parser.add_argument("--port", type=int, default=8501)
+    parser.add_argument("--address", default=None)
+    parser.add_argument("--no-sync", action="store_true", help="부팅 시 전체 동기화 생략")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(check_ready())
+
+    run_warmup(args.port, sync=not args.no_sync)
+
+    # 같은 프로세스에서 서버 시작 → 위에서 채운 st.cache_data / st.cache_resource 를 그대로 사용
+    from streamlit.web import bootstrap
+    flag_options = {"server.port": args.port}
+    if args.address:
+        flag_options["server.address"] = args.address
+    bootstrap.load_config_options(flag_options=flag_options)
+    bootstrap.run("Home.py", False, [], flag_options)
+
+if __name__ == "__main__":
+    main()
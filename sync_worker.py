@@ -0,0 +1,245 @@
+"""샤드 단위 동기화 워커
+
+users 를 `id % 샤드 수` 로 나누고, 각 워커가 DB 의 sync_leases 에서 시간 제한 리스를 잡은
+샤드만 수집합니다. 여러 프로세스/노드에서 같은 DB 를 바라보고 실행하면 됩니다.
+
+- 리밸런싱: 살아있는 워커 수(하트비트 기준)로 목표 샤드 수를 정하고, 초과분은 반납 / 부족분은 빈 샤드 획득
+- 장애 복구: 죽은 워커의 리스는 만료 후 다른 워커가 가져감
+- 중복 방지: users.synced_cycle 을 조건부 UPDATE 로 선점한 워커만 해당 주기에 레포를 수집
+- 처리량: sync_workers 테이블에 워커별 누적 수집 수 / 분당 처리량 보고 (--status 로 조회)
+- 실패 레포: sync_failures 에 사유와 다음 시도 시각을 기록하고 지수 백오프로 재시도, 반복 실패 시 dead-letter
+
+secrets.toml 예시)
+    [sync]
+    shards = 64          # 샤드 수 (모든 워커가 같은 값 사용)
+    interval = 3600      # 수집 주기(초). 주기당 레포 1회 수집 (화면 동기화 sync_missing_data 도 같은 값 사용)
+    lease_ttl = 60       # 리스/하트비트 만료(초)
+
+실행)
+    python sync_worker.py            # 워커 실행
+    python sync_worker.py --status   # 워커별 처리량 조회
+    python sync_worker.py --list-dead            # dead-letter 레포 목록
+    python sync_worker.py --requeue 닉네임 ...   # 다시 수집 대상으로 등록
+"""
+import argparse
+import math
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timezone
+
+import streamlit as st
+
+from utils import (get_storage, github_headers, sync_user, get_breaker, claim_sync, record_sync_failure, list_dead_letters, requeue_user,
+                   SYNC_INTERVAL_DEFAULT, SYNC_DUE_JOIN, SYNC_DUE_WHERE, SYNC_DUE_ORDER)
+
+SYNC_DEFAULTS = {"shards": 64, "interval": SYNC_INTERVAL_DEFAULT, "lease_ttl": 60, "batch": 50, "poll": 5}
+
+def load_sync_config():
+    config = dict(SYNC_DEFAULTS)
+    config.update(st.secrets.get("sync", {}))
+    return config
+
+class SyncWorker:
+    def __init__(self, storage, config, worker_id=None):
+        self.storage = storage
+        self.conn = storage.connect()
+        self.cursor = storage.cursor(self.conn)
+        self.shards = int(config["shards"])
+        self.interval = int(config["interval"])
+        self.lease_ttl = int(config["lease_ttl"])
+        self.batch = int(config["batch"])
+        self.poll = float(config["poll"])
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.owned = set()
+        self.synced_total = 0
+        self.window_started = time.time()
+        self.window_synced = 0
+        self.headers, self.github_token = github_headers()
+
+    def _execute(self, query, args=None):
+        self.cursor.execute(self.storage.sql(query), args or ())
+        return self.cursor
+
+    # --- 1. 리스 관리 ---
+    def ensure_shards(self):
+        self.cursor.executemany(self.storage.insert_ignore("sync_leases", ["shard_id"]), [(i,) for i in range(self.shards)])
+        self.conn.commit()
+
+    def heartbeat(self, now):
+        elapsed = max(now - self.window_started, 1e-6)
+        rate = self.window_synced / elapsed * 60
+        self._execute(
+            self.storage.upsert("sync_workers", ["worker_id", "heartbeat_at", "shards", "repos_synced", "repos_per_min"], ["worker_id"],
+                                {"heartbeat_at": "new", "shards": "new", "repos_synced": "new", "repos_per_min": "new"}),
+            (self.worker_id, int(now), ",".join(map(str, sorted(self.owned)))[:255], self.synced_total, round(rate, 2)))
+        self.conn.commit()
+        if elapsed >= 60:
+            self.window_started, self.window_synced = now, 0
+
+    def live_workers(self, now):
+        row = self._execute("SELECT COUNT(*) AS n FROM sync_workers WHERE heartbeat_at >= %s", (int(now) - self.lease_ttl,)).fetchone()
+        return max(1, int(row['n']))
+
+    def renew(self, now):
+        if not self.owned: return
+        placeholders = ", ".join(["%s"] * len(self.owned))
+        self._execute(f"UPDATE sync_leases SET lease_until = %s WHERE worker_id = %s AND shard_id IN ({placeholders})",
+                      (int(now) + self.lease_ttl, self.worker_id, *sorted(self.owned)))
+        rows = self._execute("SELECT shard_id FROM sync_leases WHERE worker_id = %s AND lease_until > %s", (self.worker_id, int(now))).fetchall()
+        self.conn.commit()
+        self.owned = {r['shard_id'] for r in rows}
+
+    def rebalance(self, now):
+        target = math.ceil(self.shards / self.live_workers(now))
+        # 초과분 반납 (새 워커가 들어오면 기존 워커가 나눠줌)
+        for shard_id in sorted(self.owned)[target:]:
+            self._execute("UPDATE sync_leases SET worker_id = NULL, lease_until = 0 WHERE shard_id = %s AND worker_id = %s", (shard_id, self.worker_id))
+            self.owned.discard(shard_id)
+        # 부족분 획득 (미할당 또는 만료된 리스만)
+        if len(self.owned) < target:
+            free = self._execute("SELECT shard_id FROM sync_leases WHERE worker_id IS NULL OR lease_until < %s ORDER BY shard_id",
+                                 (int(now),)).fetchall()
+            for row in free:
+                if len(self.owned) >= target: break
+                claimed = self._execute(
+                    "UPDATE sync_leases SET worker_id = %s, lease_until = %s WHERE shard_id = %s AND (worker_id IS NULL OR lease_until < %s)",
+                    (self.worker_id, int(now) + self.lease_ttl, row['shard_id'], int(now))).rowcount
+                if claimed == 1:
+                    self.owned.add(row['shard_id'])
+        self.conn.commit()
+
+    def release_all(self):
+        self._execute("UPDATE sync_leases SET worker_id = NULL, lease_until = 0 WHERE worker_id = %s", (self.worker_id,))
+        self._execute("DELETE FROM sync_workers WHERE worker_id = %s", (self.worker_id,))
+        self.conn.commit()
+        self.owned.clear()
+
+    # --- 2. 수집 ---
+    def pending_users(self, cycle, now):
+        # 재시도 대기 / dead 유저는 제외하고, 실패 이력이 없는 유저를 먼저 수집
+        if not self.owned: return []
+        placeholders = ", ".join(["%s"] * len(self.owned))
+        return self._execute(
+            f"SELECT u.id, u.nickname, u.repo_url FROM users u {SYNC_DUE_JOIN} "
+            f"WHERE {self.storage.shard_of('u.id', self.shards)} IN ({placeholders}) AND u.synced_cycle < %s AND {SYNC_DUE_WHERE} "
+            f"ORDER BY {SYNC_DUE_ORDER} LIMIT {int(self.batch)}",
+            (*sorted(self.owned), cycle, int(now))).fetchall()
+
+    def claim_user(self, user_id, cycle):
+        # 주기당 1회: synced_cycle 을 먼저 선점한 워커만 수집 (리스가 겹쳐도 중복 수집 없음)
+        claimed = claim_sync(self.storage, self.cursor, user_id, cycle)
+        self.conn.commit()
+        return claimed
+
+    def run_once(self):
+        now = time.time()
+        cycle = int(now // self.interval)
+        self.heartbeat(now)
+        self.renew(now)
+        self.rebalance(now)
+        synced = 0
+        last_renew = now
+        for user in self.pending_users(cycle, now):
+            # 배치가 lease_ttl 보다 길어도 리스와 하트비트(살아 있는 워커 수)를 함께 유지
+            if time.time() - last_renew > self.lease_ttl / 3:
+                self.renew(time.time())
+                self.heartbeat(time.time())
+                last_renew = time.time()
+            if user['id'] % self.shards not in self.owned:
+                continue
+            # GitHub 서킷이 열려 있으면 선점하지 않고 다음 배치로 미룸 (주기 내 재시도 가능)
+            if get_breaker("github").state == "open":
+                break
+            if not self.claim_user(user['id'], cycle):
+                continue
+            try:
+                if sync_user(self.storage, self.cursor, user, self.headers, self.github_token, datetime.now(timezone.utc)):
+                    synced += 1
+                    self.synced_total += 1
+                    self.window_synced += 1
+                self.conn.commit()
+            except Exception as e:
+                self.conn.rollback()
+                print(f"Error ({user.get('nickname')}): {e}")
+                record_sync_failure(self.storage, self.cursor, user['id'], f"error: {type(e).__name__}")
+                self.conn.commit()
+        return synced
+
+    def run_forever(self):
+        self.ensure_shards()
+        print(f"🚀 워커 시작: {self.worker_id} (샤드 {self.shards}개, 주기 {self.interval}s)")
+        try:
+            while True:
+                # 이번 배치에서 처리할 레포가 없으면 잠시 대기, 있으면 바로 다음 배치
+                if self.run_once() == 0:
+                    time.sleep(self.poll)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.release_all()
+            print(f"🛑 워커 종료: {self.worker_id} (누적 {self.synced_total}개 레포)")
+
+def print_status(storage, lease_ttl):
+    conn = storage.connect()
+    cursor = storage.cursor(conn)
+    cursor.execute("SELECT worker_id, heartbeat_at, shards, repos_synced, repos_per_min FROM sync_workers ORDER BY worker_id")
+    now = int(time.time())
+    rows = cursor.fetchall()
+    print(f"{'WORKER':<40}{'ALIVE':>7}{'SHARDS':>8}{'SYNCED':>9}{'REPOS/MIN':>11}")
+    for r in rows:
+        alive = "yes" if r['heartbeat_at'] >= now - lease_ttl else "no"
+        shard_count = len([x for x in (r['shards'] or "").split(",") if x])
+        print(f"{r['worker_id']:<40}{alive:>7}{shard_count:>8}{r['repos_synced']:>9}{float(r['repos_per_min']):>11.1f}")
+    live_rate = sum(float(r['repos_per_min']) for r in rows if r['heartbeat_at'] >= now - lease_ttl)
+    print(f"\n전체 처리량: {live_rate:.1f} repos/min")
+    cursor.execute("SELECT COALESCE(SUM(CASE WHEN dead = 0 THEN 1 ELSE 0 END), 0) AS retrying, COALESCE(SUM(dead), 0) AS dead FROM sync_failures")
+    failures = cursor.fetchone()
+    print(f"재시도 대기: {int(failures['retrying'])}개 / dead-letter: {int(failures['dead'])}개")
+    conn.close()
+
+def print_dead_letters(storage):
+    conn = storage.connect()
+    cursor = storage.cursor(conn)
+    rows = list_dead_letters(storage, cursor)
+    print(f"{'NICKNAME':<24}{'CODE':>6}{'TRIES':>7}  {'LAST FAILED (UTC)':<20} REASON / REPO")
+    for r in rows:
+        failed_at = datetime.fromtimestamp(r['last_failed_at'], timezone.utc).strftime('%Y-%m-%d %H:%M')
+        print(f"{r['nickname']:<24}{r['status_code'] or '-':>6}{r['attempts']:>7}  {failed_at:<20} {r['reason']} / {r['repo_url']}")
+    print(f"\n총 {len(rows)}개")
+    conn.close()
+
+def requeue(storage, nicknames):
+    conn = storage.connect()
+    cursor = storage.cursor(conn)
+    for nickname in nicknames:
+        print(f"{'🔁 재등록' if requeue_user(storage, cursor, nickname) else '⚠️ 없는 종목'}: {nickname}")
+    conn.commit()
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Commit Stock Market 샤드 동기화 워커")
+    parser.add_argument("--status", action="store_true", help="워커별 처리량 조회 후 종료")
+    parser.add_argument("--worker-id", help="워커 식별자 (기본: 호스트-PID-랜덤)")
+    parser.add_argument("--list-dead", action="store_true", help="dead-letter 레포 목록 조회 후 종료")
+    parser.add_argument("--requeue", nargs="+", metavar="NICKNAME", help="실패 기록을 지우고 다시 수집 대상으로 등록")
+    args = parser.parse_args()
+
+    storage = get_storage()
+    if storage is None:
+        raise SystemExit("DB 설정이 없습니다. secrets.toml 을 확인하세요.")
+    config = load_sync_config()
+    if args.status:
+        print_status(storage, int(config["lease_ttl"]))
+        return
+    if args.list_dead:
+        print_dead_letters(storage)
+        return
+    if args.requeue:
+        requeue(storage, args.requeue)
+        return
+    SyncWorker(storage, config, args.worker_id).run_forever()
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,166 @@
+import os
+import sqlite3
 import streamlit as st
 import pymysql.cursors
 import requests
+import re
+import threading
+import time
+from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from urllib.parse import urljoin
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import yfinance as yf
 import pandas as pd
+import numpy as np
 from datetime import datetime, timezone
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+
+# 0. 저장소 백엔드 (MySQL / 내장 SQLite)
+# secrets.toml 의 [storage] backend 로 선택 (기본값 mysql)
+#   [storage]
+#   backend = "sqlite"
+#   path = "commit_stock.db"
+# 공통 SQL 은 MySQL 문법(%s 플레이스홀더)으로 작성하고 storage.sql() 로 변환해서 실행
+class MySQLStorage:
+    name = "mysql"
+
+    def __init__(self, config):
+        self.config = dict(config)
+
+    def connect(self):
+        return pymysql.connect(**self.config)
+
+    def create_engine(self):
+        cfg = self.config
+        # SQLAlchemy용 URI 문자열 생성
+        uri = f"mysql+pymysql://{cfg['user']}:{cfg['password']}@{cfg['host']}:{cfg.get('port', 3306)}/{cfg['database']}"
+        return create_engine(uri)
+
+    def cursor(self, conn):
+        return conn.cursor(pymysql.cursors.DictCursor)
+
+    def sql(self, query):
+        return query
+
+    def shard_of(self, column, shards):
+        return f"MOD({column}, {int(shards)})"
+
+    def insert_ignore(self, table, columns):
+        return f"INSERT IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+
+    def upsert(self, table, columns, keys, updates):
+        # updates: {컬럼: "new"(새 값으로 덮어쓰기) | "add"(기존 값에 더하기)}
+        sets = [f"{c} = VALUES({c})" if mode == "new" else f"{c} = {c} + VALUES({c})" for c, mode in updates.items()]
+        return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+                f"ON DUPLICATE KEY UPDATE {', '.join(sets)}")
+
+def _dict_row(cursor, row):
+    return {col[0]: row[i] for i, col in enumerate(cursor.description)}
+
+class SQLiteStorage:
+    name = "sqlite"
+    SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "init.db.sqlite.sql")
+
+    def __init__(self, config):
+        self.path = config.get('path', 'commit_stock.db')
+
+    # 스키마 / 마이그레이션은 프로세스당 파일별 1번만 실행 (연결마다 하지 않음)
+    _prepared = set()
+    _prepare_lock = threading.Lock()
+
+    def connect(self):
+        created = not os.path.exists(self.path)
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        # 연결 단위 설정만 매번 적용
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        self._prepare(conn, force=created)
+        return conn
+
+    def _prepare(self, conn, force=False):
+        # force: 파일을 새로 만든 경우 (같은 프로세스에서 DB 파일을 지우고 다시 만든 경우 포함)
+        key = os.path.abspath(self.path)
+        with self._prepare_lock:
+            if key in self._prepared and not force: return
+            # WAL: 읽기(랭킹)와 쓰기(동기화)가 서로 막지 않도록 (DB 파일에 저장되는 설정)
+            conn.execute("PRAGMA journal_mode=WAL")
+            with open(self.SCHEMA_FILE, encoding="utf-8") as f:
+                conn.executescript(f.read())
+            self._migrate(conn)
+            self._prepared.add(key)
+
+    # CREATE TABLE IF NOT EXISTS 는 기존 테이블에 컬럼을 추가하지 않으므로, 나중에 추가된 컬럼은 여기서 보충
+    ADDED_COLUMNS = [("users", "synced_cycle", "BIGINT NOT NULL DEFAULT 0")]
+
+    def _migrate(self, conn):
+        for table, column, ddl in self.ADDED_COLUMNS:
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+        conn.commit()
+
+    def create_engine(self):
+        # 파일 경로 URL → SQLAlchemy 가 QueuePool 로 연결을 재사용 (스레드마다 새 연결을 만들지 않음)
+        # 실제 연결은 connect() 를 거쳐 PRAGMA 설정을 공유
+        return create_engine(f"sqlite:///{os.path.abspath(self.path)}", creator=self.connect)
+
+    def cursor(self, conn):
+        # 연결 자체의 row_factory 는 건드리지 않음 (SQLAlchemy 가 튜플 행을 기대)
+        cursor = conn.cursor()
+        cursor.row_factory = _dict_row
+        return cursor
+
+    def sql(self, query):
+        return query.replace("%s", "?")
+
+    def shard_of(self, column, shards):
+        return f"({column} % {int(shards)})"
+
+    def insert_ignore(self, table, columns):
+        return f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+
+    def upsert(self, table, columns, keys, updates):
+        sets = [f"{c} = excluded.{c}" if mode == "new" else f"{c} = {c} + excluded.{c}" for c, mode in updates.items()]
+        return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))}) "
+                f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {', '.join(sets)}")
+
+STORAGE_BACKENDS = {"mysql": MySQLStorage, "sqlite": SQLiteStorage}
+
+def get_storage():
+    backend = st.secrets.get("storage", {}).get("backend", "mysql")
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend}")
+    if backend == "mysql":
+        if "mysql" not in st.secrets:
+            return None
+        return MySQLStorage(st.secrets["mysql"])
+    return SQLiteStorage(st.secrets.get("storage", {}))
 
 # 1. DB 연결 (기존 INSERT/UPDATE CRUD 작업용)
 def init_connection():
-    if "mysql" not in st.secrets:
+    storage = get_storage()
+    if storage is None:
         return None
-    return pymysql.connect(**st.secrets["mysql"])
+    return storage.connect()
 
 # 2. SQLAlchemy 엔진 연결 (Pandas read_sql 전용 - Warning 해결용)
 @st.cache_resource
 def init_engine():
-    if "mysql" not in st.secrets:
+    storage = get_storage()
+    if storage is None:
         return None
-    db_config = st.secrets["mysql"]
-    user = db_config['user']
-    pw = db_config['password']
-    host = db_config['host']
-    db = db_config['database']
-    port = db_config.get('port', 3306)
-    
-    # SQLAlchemy용 URI 문자열 생성
-    uri = f"mysql+pymysql://{user}:{pw}@{host}:{port}/{db}"
-    return create_engine(uri)
+    return storage.create_engine()
 
 # 3. 유저 추가
 def add_user_to_db(conn, nickname, repo_url):
     if not conn: return False
     try:
-        cursor = conn.cursor()
-        cursor.execute("INSERT IGNORE INTO users (nickname, repo_url) VALUES (%s, %s)", (nickname, repo_url))
+        storage = get_storage()
+        cursor = storage.cursor(conn)
+        cursor.execute(storage.insert_ignore("users", ["nickname", "repo_url"]), (nickname, repo_url))
+        if cursor.rowcount == 1:
+            bump_data_version(cursor)
         conn.commit()
         cursor.close()
         return True
@@ -41,13 +169,7 @@ def add_user_to_db(conn, nickname, repo_url):
         return False
 
 # 4. 데이터 동기화
-def sync_missing_data(conn):
-    if not conn: return 0
-    
-    cursor = conn.cursor(pymysql.cursors.DictCursor)
-    cursor.execute("SELECT id, nickname, repo_url FROM users")
-    users = cursor.fetchall()
-    
+def github_headers():
     # 1. 헤더 설정 수정 (클래식 토큰은 'token' 접두사가 더 안정적일 수 있음)
     headers = {"Accept": "application/vnd.github.v3+json"}
     
@@ -58,58 +180,772 @@ def sync_missing_data(conn):
         headers["Authorization"] = f"token {github_token}"
     else:
         print("⚠️ GitHub 토큰이 설정되지 않았습니다. (Rate Limit에 걸릴 수 있음)")
+    return headers, github_token
+
+# 유저 1명의 최근 30일 커밋을 가져와 daily_commits 에 반영 (성공 시 True)
+# sync_missing_data 와 sync_worker.py 가 공통으로 사용
+def _github_unavailable(response):
+    if response.status_code >= 500 or response.status_code == 429: return True
+    return response.status_code == 403 and response.headers.get("X-RateLimit-Remaining") == "0"
+
+def sync_user(storage, cursor, user, headers, github_token=None, today_dt=None):
+    today_dt = today_dt or datetime.now(timezone.utc)
+    since_date_str = (today_dt - pd.Timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    clean_url = user['repo_url'].strip().rstrip('/').replace('.git', '')
+    parts = clean_url.split('/')
+    if len(parts) < 2:
+        record_sync_failure(storage, cursor, user['id'], "invalid repo url")
+        return False
+    
+    owner, repo = parts[-2], parts[-1]
+    api_url = f"https://api.github.com/repos/{owner}/{repo}/commits"
+    params = {"since": since_date_str, "per_page": 100}
     
+    # 5xx / Rate Limit(429, 남은 한도 0 인 403) 만 GitHub 장애로 집계 (404, 401 은 레포 단위 문제)
+    response, outcome = call_external(
+        "github", lambda: requests.get(api_url, headers=headers, params=params, timeout=10),
+        failure_if=_github_unavailable, with_outcome=True)
+    
+    # 서킷 open / 풀 대기 초과 / 네트워크 오류 / Rate Limit / 5xx 는 레포 탓이 아님 → 레포 재시도 일정에는 반영하지 않음
+    if outcome in ("open", "queued", "error"):
+        print(f"⏸️ {user['nickname']} 건너뜀: GitHub 호출 불가 ({outcome}, 서킷 상태: {get_breaker('github').state})")
+        return False
+    elif outcome == "timeout":
+        # 요청 timeout(ReadTimeout / ConnectTimeout) 또는 실제 호출이 deadline 을 다 씀 → 레포 단위로 백오프
+        print(f"⏸️ {user['nickname']} 건너뜀: GitHub 응답 지연")
+        record_sync_failure(storage, cursor, user['id'], "timeout")
+        return False
+    elif outcome == "rejected":
+        # Rate Limit 은 토큰 단위, 5xx 는 GitHub 장애
+        print(f"⏸️ {user['nickname']} 건너뜀: GitHub 응답 {response.status_code}")
+        return False
+    elif response.status_code == 200:
+        commits = response.json()
+        print(f"✅ {user['nickname']} ({owner}/{repo}): 커밋 {len(commits)}개 발견")
+        record_commits(storage, cursor, user['id'], commits, today_dt)
+        clear_sync_failure(storage, cursor, user['id'])
+        return True
+        
+    elif response.status_code == 401:
+        # 401 에러 발생 시 헤더를 token 대신 Bearer로 한 번 더 시도해볼 수 있도록 로그 출력
+        print(f"❌ {user['nickname']} 인증 실패 (401): 토큰 자체가 잘못되었거나 접두사 문제일 수 있습니다.")
+        print(f"   현재 사용된 토큰 앞글자: {github_token[:7] if github_token else 'None'}...")
+        record_sync_failure(storage, cursor, user['id'], "unauthorized", 401)
+    else:
+        print(f"❌ {user['nickname']} 실패 (코드: {response.status_code})")
+        reason = {404: "not found", 403: "forbidden", 409: "empty repository"}.get(response.status_code, "http error")
+        record_sync_failure(storage, cursor, user['id'], reason, response.status_code)
+    return False
+
+# 실패 레포 재시도 큐 (sync_failures)
+# - 실패할 때마다 attempts 증가, 다음 시도는 지수 백오프 (10분, 20분, 40분 ... 최대 24시간)
+# - SYNC_MAX_ATTEMPTS 번 연속 실패하면 dead (일반 동기화에서 제외, 운영자가 requeue_user 로 복구)
+# - 성공하면 행 삭제
+SYNC_RETRY_BASE_SECONDS = 600
+SYNC_RETRY_MAX_SECONDS = 86400
+SYNC_MAX_ATTEMPTS = 6
+
+# 일반 동기화 대상: 실패 기록이 없거나, dead 가 아니고 재시도 시각이 지난 유저
+# 정상 유저 → 오래전에 수집한 유저(새로 상장한 유저는 synced_cycle = 0) 순으로 처리해 시간 한도가 있어도 신규 종목을 먼저 수집
+SYNC_DUE_JOIN = "LEFT JOIN sync_failures f ON f.user_id = u.id"
+SYNC_DUE_WHERE = "(f.user_id IS NULL OR (f.dead = 0 AND f.next_attempt_at <= %s))"
+SYNC_DUE_ORDER = "(f.user_id IS NOT NULL), u.synced_cycle, u.id"
+
+def retry_delay(attempts):
+    return min(SYNC_RETRY_BASE_SECONDS * 2 ** (attempts - 1), SYNC_RETRY_MAX_SECONDS)
+
+def record_sync_failure(storage, cursor, user_id, reason, status_code=None, now=None):
+    now = int(now or time.time())
+    cursor.execute(storage.sql("SELECT attempts FROM sync_failures WHERE user_id = %s"), (user_id,))
+    row = cursor.fetchone()
+    attempts = (row['attempts'] if row else 0) + 1
+    dead = 1 if attempts >= SYNC_MAX_ATTEMPTS else 0
+    cursor.execute(
+        storage.upsert("sync_failures", ["user_id", "reason", "status_code", "attempts", "next_attempt_at", "dead", "last_failed_at"], ["user_id"],
+                       {"reason": "new", "status_code": "new", "attempts": "new", "next_attempt_at": "new", "dead": "new", "last_failed_at": "new"}),
+        (user_id, reason[:255], status_code, attempts, now + retry_delay(attempts), dead, now))
+    if dead:
+        print(f"☠️ user_id={user_id} dead-letter 이동 ({attempts}회 실패, 마지막 사유: {reason})")
+    return attempts
+
+def clear_sync_failure(storage, cursor, user_id):
+    cursor.execute(storage.sql("DELETE FROM sync_failures WHERE user_id = %s"), (user_id,))
+
+def list_dead_letters(storage, cursor):
+    cursor.execute(storage.sql("""
+        SELECT u.id, u.nickname, u.repo_url, f.reason, f.status_code, f.attempts, f.last_failed_at
+        FROM sync_failures f JOIN users u ON u.id = f.user_id
+        WHERE f.dead = 1 ORDER BY f.last_failed_at DESC
+    """))
+    return cursor.fetchall()
+
+# 운영자 복구: 실패 기록을 지워 다음 동기화(워커는 현재 주기)에서 바로 다시 수집
+def requeue_user(storage, cursor, nickname):
+    cursor.execute(storage.sql("SELECT id FROM users WHERE nickname = %s"), (nickname,))
+    row = cursor.fetchone()
+    if row is None: return False
+    clear_sync_failure(storage, cursor, row['id'])
+    cursor.execute(storage.sql("UPDATE users SET synced_cycle = 0 WHERE id = %s"), (row['id'],))
+    return True
+
+# 수집 주기: sync_worker.py 와 같은 [sync] interval 을 사용. 레포는 주기당 1회만 수집
+SYNC_INTERVAL_DEFAULT = 3600
+
+def current_sync_cycle(now=None):
+    interval = int(st.secrets.get("sync", {}).get("interval", SYNC_INTERVAL_DEFAULT))
+    return int((now or time.time()) // interval)
+
+def claim_sync(storage, cursor, user_id, cycle):
+    # synced_cycle 을 먼저 선점한 쪽(워커 / 화면 동기화)만 이번 주기에 수집 → 어디서 실행해도 중복 수집 없음
+    cursor.execute(storage.sql("UPDATE users SET synced_cycle = %s WHERE id = %s AND synced_cycle < %s"), (cycle, user_id, cycle))
+    return cursor.rowcount == 1
+
+# 화면(세션 시작, Sync 버튼, 상장)에서 돌리는 동기화의 시간 한도(초). 남은 유저는 다음 동기화나 워커가 이어서 처리
+# 한도를 넘긴 뒤에는 새 유저를 시작하지 않으므로 최악의 대기 = 한도 + GitHub deadline 1회
+SYNC_PAGE_BUDGET_DEFAULT = 20
+
+def sync_page_budget():
+    return float(st.secrets.get("sync", {}).get("page_budget", SYNC_PAGE_BUDGET_DEFAULT))
+
+def sync_missing_data(conn, budget=None):
+    if not conn: return 0
+    
+    storage = get_storage()
+    cursor = storage.cursor(conn)
+    cycle = current_sync_cycle()
+    # 이번 주기에 이미 (워커 또는 다른 세션이) 수집한 유저는 제외
+    cursor.execute(storage.sql(f"SELECT u.id, u.nickname, u.repo_url FROM users u {SYNC_DUE_JOIN} "
+                               f"WHERE u.synced_cycle < %s AND {SYNC_DUE_WHERE} ORDER BY {SYNC_DUE_ORDER}"),
+                   (cycle, int(time.time())))
+    users = cursor.fetchall()
+    
+    headers, github_token = github_headers()
     today_dt = datetime.now(timezone.utc)
-    since_date_str = (today_dt - pd.Timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%SZ')
     
     updated_total = 0
+    completed = True
+    started = time.monotonic()
     print(f"🔄 동기화 시작 (대상: {len(users)}명)")
 
     for user in users:
+        # GitHub 서킷이 열려 있으면 선점하지 않고 중단 (다음 동기화에서 다시 시도)
+        if get_breaker("github").state == "open":
+            completed = False
+            break
+        if budget is not None and time.monotonic() - started >= budget:
+            print(f"⏱️ 동기화 시간 한도({budget:g}s) 도달: 남은 유저는 다음 동기화에서 처리")
+            completed = False
+            break
+        claimed = claim_sync(storage, cursor, user['id'], cycle)
+        conn.commit()
+        if not claimed:
+            continue
         try:
-            clean_url = user['repo_url'].strip().rstrip('/').replace('.git', '')
-            parts = clean_url.split('/')
-            if len(parts) < 2: continue
-            
-            owner, repo = parts[-2], parts[-1]
-            api_url = f"https://api.github.com/repos/{owner}/{repo}/commits"
-            params = {"since": since_date_str, "per_page": 100}
-            
-            response = requests.get(api_url, headers=headers, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                commits = response.json()
-                print(f"✅ {user['nickname']} ({owner}/{repo}): 커밋 {len(commits)}개 발견")
-                
-                date_counts = {}
-                for commit in commits:
-                    raw_date = commit['commit']['author']['date'].split('T')[0]
-                    date_counts[raw_date] = date_counts.get(raw_date, 0) + 1
-                
-                batch_data = []
-                for i in range(31):
-                    target_date = (today_dt.date() - pd.Timedelta(days=i)).strftime('%Y-%m-%d')
-                    count = date_counts.get(target_date, 0)
-                    batch_data.append((user['id'], target_date, count))
-                
-                cursor.executemany("""
-                    INSERT INTO daily_commits (user_id, commit_date, count)
-                    VALUES (%s, %s, %s)
-                    ON DUPLICATE KEY UPDATE count = VALUES(count)
-                """, batch_data)
+            if sync_user(storage, cursor, user, headers, github_token, today_dt):
                 updated_total += 1
-                
-            elif response.status_code == 401:
-                # 401 에러 발생 시 헤더를 token 대신 Bearer로 한 번 더 시도해볼 수 있도록 로그 출력
-                print(f"❌ {user['nickname']} 인증 실패 (401): 토큰 자체가 잘못되었거나 접두사 문제일 수 있습니다.")
-                print(f"   현재 사용된 토큰 앞글자: {github_token[:7] if github_token else 'None'}...")
-            else:
-                print(f"❌ {user['nickname']} 실패 (코드: {response.status_code})")
-
         except Exception as e:
             print(f"Error ({user.get('nickname')}): {e}")
+            record_sync_failure(storage, cursor, user['id'], f"error: {type(e).__name__}")
             continue
             
     conn.commit()
     cursor.close()
-    return updated_total
\ No newline at end of file
+    # 끝까지 돌았을 때만 "최근 전체 동기화" 로 기록 (중간에 멈췄으면 다음 세션이 이어서 동기화)
+    if completed:
+        _last_full_sync["at"] = time.time()
+    return updated_total
+
+# 커밋 이벤트 로그 (commits) → daily_commits 재집계
+# - commits 는 (user_id, sha) 기준 append-only. 같은 커밋을 여러 번 받아도(폴링 구간 겹침, 동시 동기화) 1번만 기록
+# - 새 커밋은 한 번에 INSERT IGNORE 하고, 새 커밋이 들어간 날짜만 로그에서 다시 셈 (더하기 없이 로그 기준 값으로 덮어씀)
+# - 최근 31일 구간 밖(리베이스 등으로 작성일이 오래된 커밋)은 로그에만 남김: 봉인된 과거 이력 캐시를 건드리지 않도록
+SYNC_WINDOW_DAYS = 31
+
+def record_commits(storage, cursor, user_id, commits, today_dt=None):
+    today_dt = today_dt or datetime.now(timezone.utc)
+    window = [(today_dt.date() - pd.Timedelta(days=i)).strftime('%Y-%m-%d') for i in range(SYNC_WINDOW_DAYS)]
+
+    cursor.execute(storage.sql("SELECT 1 FROM commits WHERE user_id = %s LIMIT 1"), (user_id,))
+    bootstrap = cursor.fetchone() is None
+
+    fetched = {c['sha']: c['commit']['author']['date'].split('T')[0] for c in commits}
+    known = set()
+    shas = list(fetched)
+    for i in range(0, len(shas), 500):
+        chunk = shas[i:i + 500]
+        cursor.execute(storage.sql(f"SELECT sha FROM commits WHERE user_id = %s AND sha IN ({', '.join(['%s'] * len(chunk))})"),
+                       (user_id, *chunk))
+        known.update(row['sha'] for row in cursor.fetchall())
+
+    # 이미 기록된 커밋을 뺀 나머지를 한 번에 INSERT IGNORE (동시 동기화가 먼저 넣은 행은 무시됨)
+    new_commits = [(user_id, sha, author_date) for sha, author_date in fetched.items() if sha not in known]
+    if new_commits:
+        cursor.executemany(storage.insert_ignore("commits", ["user_id", "sha", "author_date"]), new_commits)
+
+    # 구간 내 모든 날짜에 행이 있도록 0 으로 채움 (이미 있으면 유지)
+    cursor.executemany(storage.insert_ignore("daily_commits", ["user_id", "commit_date", "count"]),
+                       [(user_id, d, 0) for d in window])
+    zero_filled = cursor.rowcount > 0
+
+    # 새 커밋이 들어간 날짜만 로그 기준으로 재집계 → 동시 동기화가 겹쳐도 결과는 로그와 같음
+    touched = sorted({author_date for _, _, author_date in new_commits if window[-1] <= author_date <= window[0]})
+    if bootstrap:
+        # 이벤트 로그 도입 전 집계값은 로그와 맞춰 구간 전체를 다시 계산
+        recount_daily_commits(storage, cursor, user_id, window[-1], window[0])
+    elif touched:
+        recount_daily_commits(storage, cursor, user_id, touched[0], touched[-1])
+    elif zero_filled:
+        bump_data_version(cursor)
+    return len(new_commits)
+
+# 로그 기준 재집계 (API 호출 없이 commits 의 (user_id, author_date) 인덱스 범위 집계)
+def recount_daily_commits(storage, cursor, user_id, start, end):
+    cursor.execute(storage.sql("""
+        SELECT author_date, COUNT(*) AS n FROM commits
+        WHERE user_id = %s AND author_date BETWEEN %s AND %s
+        GROUP BY author_date
+    """), (user_id, start, end))
+    counts = {str(row['author_date']): row['n'] for row in cursor.fetchall()}
+    dates = pd.date_range(start, end).strftime('%Y-%m-%d')
+    cursor.executemany(
+        storage.upsert("daily_commits", ["user_id", "commit_date", "count"], ["user_id", "commit_date"], {"count": "new"}),
+        [(user_id, d, counts.get(d, 0)) for d in dates])
+    bump_data_version(cursor)
+    return sum(counts.values())
+
+# 데이터 버전 카운터 (data_version 1행). daily_commits / users 를 바꾼 트랜잭션 안에서 호출
+def bump_data_version(cursor):
+    cursor.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+
+# 전체 동기화 시각 (프로세스 단위). 부팅 워밍업 직후 접속한 세션은 다시 동기화하지 않음
+SYNC_FRESH_SECONDS = 600
+_last_full_sync = {"at": 0.0}
+
+def sync_is_fresh(max_age=SYNC_FRESH_SECONDS):
+    return time.time() - _last_full_sync["at"] < max_age
+
+# 5. 리더보드 (순위 계산은 데이터 버전당 1회, 페이지/검색은 메모리 인덱스)
+# - 최근 14개 거래일(날짜) 기준: 앞 7일 = 현재 7D MA, 뒤 7일 = 직전 7D MA
+# - 순위는 전체 유저 기준으로 매김 (동점은 id 오름차순)
+# - 비용: 전체 유저 집계 쿼리는 데이터 버전이 바뀔 때 1번 (get_leaderboard_cached).
+#   그 뒤 페이지 이동 / 접두사 검색 / 내 순위 조회는 DB 를 타지 않고 정렬된 닉네임 배열에서 이진 탐색
+LEADERBOARD_SQL = """
+WITH recent_dates AS (
+    SELECT commit_date, ROW_NUMBER() OVER (ORDER BY commit_date DESC) AS day_no
+    FROM (SELECT DISTINCT commit_date FROM daily_commits ORDER BY commit_date DESC LIMIT 14) t
+),
+scores AS (
+    SELECT u.id, u.nickname,
+           COALESCE(SUM(CASE WHEN r.day_no <= 7 THEN d.count END), 0) / 7.0 AS curr_ma,
+           COALESCE(SUM(CASE WHEN r.day_no > 7 THEN d.count END), 0) / 7.0 AS prev_ma
+    FROM users u
+    LEFT JOIN daily_commits d ON d.user_id = u.id
+        AND d.commit_date IN (SELECT commit_date FROM recent_dates)
+    LEFT JOIN recent_dates r ON r.commit_date = d.commit_date
+    GROUP BY u.id, u.nickname
+)
+SELECT id, nickname, curr_ma, curr_ma - prev_ma AS diff,
+       ROW_NUMBER() OVER (ORDER BY curr_ma DESC, id ASC) AS ranking
+FROM scores
+ORDER BY ranking
+"""
+
+def _next_prefix(key):
+    # key 로 시작하는 모든 문자열보다 큰 가장 작은 문자열 (마지막 글자 코드 포인트 + 1, 최댓값 글자는 떼고 올림)
+    key = key.rstrip(chr(0x10FFFF))
+    return key[:-1] + chr(ord(key[-1]) + 1) if key else None
+
+class Leaderboard:
+    __slots__ = ("frame", "_names", "_name_rows")
+
+    def __init__(self, frame):
+        self.frame = frame.reset_index(drop=True)   # 순위 순서
+        # 대소문자 무시 접두사 검색용 (MySQL/SQLite 의 LIKE 와 같은 동작)
+        keys = self.frame['nickname'].str.lower().to_numpy(dtype=object)
+        order = np.argsort(keys, kind='stable')
+        self._names = keys[order]
+        self._name_rows = order
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _prefix_rows(self, prefix):
+        # 접두사로 시작하는 문자열은 [key, 다음 접두사) 구간에 모임
+        key = prefix.lower()
+        lo = np.searchsorted(self._names, key, side='left')
+        upper = _next_prefix(key)
+        hi = len(self._names) if upper is None else np.searchsorted(self._names, upper, side='left')
+        return np.sort(self._name_rows[lo:hi])
+
+    def page(self, page=1, page_size=10, prefix=""):
+        # 반환: (해당 페이지 DataFrame, 검색 조건에 맞는 전체 유저 수)
+        page, page_size = max(1, int(page)), int(page_size)
+        prefix = (prefix or "").strip()
+        start = (page - 1) * page_size
+        if not prefix:
+            return self.frame.iloc[start:start + page_size], len(self.frame)
+        rows = self._prefix_rows(prefix)
+        return self.frame.iloc[rows[start:start + page_size]], len(rows)
+
+    def rank_of(self, nickname):
+        # "내 순위로 이동"용: 해당 유저의 전체 순위 (없으면 None)
+        # 검색과 같이 대소문자 무시. 대소문자만 다른 닉네임이 여럿이면 정확히 일치하는 쪽, 없으면 높은 순위
+        nickname = (nickname or "").strip()
+        if not nickname: return None
+        key = nickname.lower()
+        matches = [row for row in self._prefix_rows(nickname) if self.frame['nickname'].iat[row].lower() == key]
+        if not matches: return None
+        exact = [row for row in matches if self.frame['nickname'].iat[row] == nickname]
+        return int(self.frame['ranking'].iat[(exact or matches)[0]])
+
+def load_leaderboard(engine):
+    if engine is None:
+        return Leaderboard(pd.DataFrame(columns=['id', 'nickname', 'curr_ma', 'diff', 'ranking']))
+    df = pd.read_sql(text(LEADERBOARD_SQL), engine)
+    # MySQL은 DECIMAL을 반환하므로 float으로 통일
+    df[['curr_ma', 'diff']] = df[['curr_ma', 'diff']].astype(float)
+    return Leaderboard(df)
+
+
+# 6. 커밋 이력 컨테이너 (pivot 대체)
+# df.pivot(...).fillna(0) 은 dates×users float64 밀집 행렬을 만듦. 대신
+#   - counts   : (날짜 수, 유저 수) int16 행렬 (하루 커밋 수는 32767 로 clip)
+#   - user_ids : 열 순서의 유저 id 배열 (int32, 오름차순)
+#   - dates    : 행 순서의 날짜 배열 (datetime64[D], 빈 날짜 없이 연속)
+# 메모리 예산 (유저 1,000명 × 1년 = 365일 기준)
+#   - counts   : 365 × 1,000 × 2B ≈ 0.73 MB  (float64 pivot 은 ≈ 2.92 MB)
+#   - user_ids : 1,000 × 4B ≈ 4 KB / dates : 365 × 8B ≈ 3 KB
+#   - rolling_mean 계산 시 임시 int32 누적합 ≈ 1.46 MB + 결과 float32 (요청 구간 크기만큼)
+#   → 상주 메모리 1k 유저 × 1년당 약 0.74 MB (유저 수, 기간에 선형 비례)
+INT16_MAX = np.iinfo(np.int16).max
+
+class CommitHistory:
+    __slots__ = ('dates', 'user_ids', 'counts')
+
+    def __init__(self, dates, user_ids, counts):
+        self.dates = dates
+        self.user_ids = user_ids
+        self.counts = counts
+
+    @classmethod
+    def from_records(cls, user_ids, commit_dates, counts):
+        # (user_id, commit_date, count) long 포맷 배열에서 바로 구성 (중간 pivot 없음)
+        dates = pd.to_datetime(pd.Series(commit_dates)).values.astype('datetime64[D]')
+        if len(dates) == 0:
+            return cls(np.array([], dtype='datetime64[D]'), np.array([], dtype=np.int32), np.zeros((0, 0), dtype=np.int16))
+        uids = np.asarray(user_ids, dtype=np.int32)
+        first_date = dates.min()
+        date_index = np.arange(first_date, dates.max() + 1)
+        user_index = np.unique(uids)
+        matrix = np.zeros((len(date_index), len(user_index)), dtype=np.int16)
+        rows = (dates - first_date).astype(np.int64)
+        cols = np.searchsorted(user_index, uids)
+        matrix[rows, cols] = np.clip(np.asarray(counts, dtype=np.int64), 0, INT16_MAX)
+        return cls(date_index, user_index, matrix)
+
+    @property
+    def nbytes(self):
+        return self.dates.nbytes + self.user_ids.nbytes + self.counts.nbytes
+
+    @property
+    def last_date(self):
+        return self.dates[-1] if len(self.dates) else None
+
+    def _row_range(self, start=None, end=None):
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start, 'D'), side='left'))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(end, 'D'), side='right'))
+        return lo, hi
+
+    def _columns(self, user_ids=None):
+        if user_ids is None: return slice(None), self.user_ids
+        wanted = np.asarray(user_ids, dtype=np.int32)
+        cols = np.searchsorted(self.user_ids, wanted)
+        found = cols < len(self.user_ids)
+        found[found] = self.user_ids[cols[found]] == wanted[found]
+        return cols[found], wanted[found]
+
+    def slice(self, start=None, end=None, user_ids=None):
+        # 표시 구간/유저로 자르기 (행 범위는 복사 없이 view)
+        lo, hi = self._row_range(start, end)
+        cols, uids = self._columns(user_ids)
+        return CommitHistory(self.dates[lo:hi], uids, self.counts[lo:hi][:, cols])
+
+    def rolling_mean(self, window=7, start=None, end=None, user_ids=None):
+        # rolling(window, min_periods=1).mean() 과 동일한 값. 구간 앞쪽 window-1 일을 함께 읽어
+        # 잘린 구간에서도 이동평균이 끊기지 않게 하고, 누적합 차분으로 O(날짜×유저) 계산
+        lo, hi = self._row_range(start, end)
+        cols, uids = self._columns(user_ids)
+        base = max(0, lo - window + 1)
+        block = self.counts[base:hi][:, cols]
+        csum = np.zeros((block.shape[0] + 1, block.shape[1]), dtype=np.int32)
+        np.cumsum(block, axis=0, dtype=np.int32, out=csum[1:])
+        idx = np.arange(base, hi)
+        upper = idx - base + 1
+        lower = np.maximum(idx - window + 1 - base, 0)
+        periods = np.minimum(idx + 1, window).astype(np.float32)
+        sums = csum[upper] - csum[lower]
+        means = (sums / periods[:, None]).astype(np.float32)
+        offset = lo - base
+        return self.dates[lo:hi], uids, means[offset:]
+
+    def to_frame(self, values=None, dates=None, user_ids=None, names=None):
+        # 차트 표시용 (작은 구간만) DataFrame 변환. names: {user_id: nickname}
+        values = self.counts if values is None else values
+        dates = self.dates if dates is None else dates
+        user_ids = self.user_ids if user_ids is None else user_ids
+        columns = [names.get(int(u), str(u)) for u in user_ids] if names else list(user_ids)
+        return pd.DataFrame(values, index=pd.DatetimeIndex(dates), columns=columns)
+
+def read_commit_records(engine):
+    return pd.read_sql("SELECT user_id, commit_date, count FROM daily_commits", engine)
+
+def history_from_frame(df):
+    return CommitHistory.from_records(df['user_id'].values, df['commit_date'].values, df['count'].values)
+
+def load_commit_history(engine):
+    if engine is None: return CommitHistory.from_records([], [], [])
+    return history_from_frame(read_commit_records(engine))
+
+
+# 7. 시장 데이터 & 티커 (Home / Ranking / GeekNews 공통)
+TICKER_SYMBOLS = ['MSFT', 'NVDA', 'AAPL', 'BTC-USD']
+RANKING_SYMBOLS = ('MSFT', 'NVDA', 'AAPL', 'GOOGL', 'TSLA', '005930.KS', '000660.KS', 'BTC-USD')
+KRX_NAMES = {'005930.KS': "SAMSUNG", '000660.KS': "SK HYNIX"}
+
+MARKET_FALLBACK = [{"name": "SYSTEM", "price": "ONLINE", "change": 0.0}]
+
+def _fetch_market_data(symbols):
+    symbols = list(symbols)
+    needs_krw = any('.KS' in symbol for symbol in symbols)
+    data_list = []
+    tickers = yf.Tickers(' '.join(symbols + (['KRW=X'] if needs_krw else [])))
+    usd_krw_rate = 1400.0
+    if needs_krw:
+        try: usd_krw_rate = tickers.tickers['KRW=X'].fast_info.last_price
+        except Exception: pass
+    for symbol in symbols:
+        try:
+            info = tickers.tickers[symbol].fast_info
+            price, prev_close = info.last_price, info.previous_close
+            change_pct = ((price - prev_close) / prev_close) * 100
+            if '.KS' in symbol: price = price / usd_krw_rate
+            name = KRX_NAMES.get(symbol, symbol.replace('-USD', ''))
+            data_list.append({"name": name, "price": f"{price:,.2f}", "change": change_pct})
+        except Exception: continue
+    if not data_list:
+        raise RuntimeError("yfinance returned no quotes")
+    return data_list
+
+@st.cache_data(ttl=300)
+def get_market_data(symbols=tuple(TICKER_SYMBOLS)):
+    symbols = tuple(symbols)
+    return call_external("yfinance", lambda: _fetch_market_data(symbols), key=symbols, fallback=MARKET_FALLBACK)
+
+def build_ticker_html(market_data, extra_items=()):
+    # extra_items: (라벨, 값, css 클래스) 튜플
+    spans = []
+    for item in market_data:
+        if item['change'] > 0: c, a, s = "up", "▲", "+"
+        elif item['change'] < 0: c, a, s = "down", "▼", ""
+        else: c, a, s = "flat", "-", ""
+        spans.append(f'<span class="ticker-item">{item["name"]}: ${item["price"]} <span class="{c}">{a} {s}{item["change"]:.2f}%</span></span>')
+    for label, value, css in extra_items:
+        value_html = f'<span class="{css}">{value}</span>' if css else value
+        spans.append(f'<span class="ticker-item">{label}: {value_html}</span>')
+    return f'<div class="ticker-wrap"><div class="ticker">{"".join(spans)}</div></div>'
+
+# 티커는 시세 캐시 주기(5분)마다 스스로 갱신되는 fragment. 페이지 rerun 과 무관
+@st.fragment(run_every=300)
+def render_ticker(symbols=tuple(TICKER_SYMBOLS), extra_items=()):
+    st.markdown(build_ticker_html(get_market_data(tuple(symbols)), extra_items), unsafe_allow_html=True)
+
+# 8. 데이터 버전 & 버전 단위 캐시
+# 버전은 쓰기 쪽(record_commits / recount_daily_commits / add_user_to_db)이 올리는 카운터라
+# 확인 비용은 유저 수와 무관하게 PK 1행 조회
+def get_data_version(engine):
+    if engine is None: return "none"
+    with engine.connect() as db:
+        version = db.execute(text("SELECT version FROM data_version WHERE id = 1")).scalar()
+    return f"v{version or 0}"
+
+LEADERBOARD_PAGE_SIZE = 20
+
+# 순위표도 cache_resource 로 버전당 1개만 보관 (페이지/검색은 복사 없이 슬라이스)
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_leaderboard_cached(_engine, data_version):
+    return load_leaderboard(_engine)
+
+def get_leaderboard_page_cached(_engine, data_version, page=1, page_size=10, prefix=""):
+    return get_leaderboard_cached(_engine, data_version).page(page, page_size, prefix)
+
+def get_user_rank_cached(_engine, data_version, nickname):
+    return get_leaderboard_cached(_engine, data_version).rank_of(nickname)
+
+# 이력은 cache_resource 로 보관 (cache_data 는 호출마다 복사본을 만듦). 버전이 바뀌면 교체
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_commit_history_cached(_engine, data_version):
+    snapshot_dir = st.secrets.get("warmup", {}).get("snapshot_dir")
+    if _engine is None or not snapshot_dir:
+        return load_commit_history(_engine)
+    return history_from_frame(load_history_snapshot(_engine, snapshot_dir, data_version))
+
+# Parquet 스냅샷: 재시작 후 첫 전체 테이블 read_sql 대신 로컬 파일을 읽음 (같은 데이터 버전일 때만 사용)
+def history_snapshot_path(snapshot_dir, data_version):
+    return os.path.join(snapshot_dir, f"daily_commits-{re.sub(r'[^0-9A-Za-z_-]', '_', data_version)}.parquet")
+
+def load_history_snapshot(engine, snapshot_dir, data_version):
+    path = history_snapshot_path(snapshot_dir, data_version)
+    if os.path.exists(path):
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            print(f"Snapshot Error: {e}")
+    df = read_commit_records(engine)
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        df.to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        # 이전 버전 스냅샷 정리 (최신 1개만 유지)
+        for name in os.listdir(snapshot_dir):
+            if name.startswith("daily_commits-") and name.endswith(".parquet") and os.path.join(snapshot_dir, name) != path:
+                os.remove(os.path.join(snapshot_dir, name))
+    except Exception as e:
+        print(f"Snapshot Error: {e}")
+    return df
+
+
+# 9. 자산 상세: 구간(chunk) 단위 지연 로딩 + LTTB 다운샘플링
+# 이력은 에포크 기준 90일 단위 chunk 로 잘라 필요한 구간만 읽고 chunk 별로 캐시
+# 최근 chunk(동기화가 덮어쓰는 30일 포함)만 데이터 버전을 키로 쓰고, 그 이전 chunk 는 고정
+HISTORY_CHUNK_DAYS = 90
+CHART_MAX_POINTS = 300
+_EPOCH_DAY = np.datetime64('1970-01-01', 'D')
+
+def get_asset(engine, nickname):
+    if engine is None or not nickname: return None
+    with engine.connect() as db:
+        row = db.execute(text("""
+            SELECT u.id, u.nickname, u.repo_url, MIN(d.commit_date) AS first_date, MAX(d.commit_date) AS last_date
+            FROM users u LEFT JOIN daily_commits d ON d.user_id = u.id
+            WHERE u.nickname = :nickname
+            GROUP BY u.id, u.nickname, u.repo_url
+        """), {'nickname': nickname.strip()}).mappings().first()
+    return dict(row) if row else None
+
+def history_chunk_starts(start, end):
+    start, end = np.datetime64(start, 'D'), np.datetime64(end, 'D')
+    first = (start - _EPOCH_DAY).astype(int) // HISTORY_CHUNK_DAYS
+    last = (end - _EPOCH_DAY).astype(int) // HISTORY_CHUNK_DAYS
+    return [_EPOCH_DAY + np.timedelta64(i * HISTORY_CHUNK_DAYS, 'D') for i in range(first, last + 1)]
+
+@st.cache_data(ttl=86400, max_entries=2048, show_spinner=False)
+def get_history_chunk(_engine, user_id, chunk_start, chunk_version):
+    chunk_end = np.datetime64(chunk_start, 'D') + np.timedelta64(HISTORY_CHUNK_DAYS, 'D')
+    df = pd.read_sql(
+        text("SELECT commit_date, count FROM daily_commits WHERE user_id = :user_id AND commit_date >= :start AND commit_date < :end"),
+        _engine, params={'user_id': int(user_id), 'start': str(chunk_start), 'end': str(chunk_end)})
+    return pd.Series(df['count'].astype(np.int16).values, index=pd.to_datetime(df['commit_date']))
+
+def load_user_history(engine, user_id, start, end, data_version):
+    # start~end 에 걸친 chunk 만 읽어 일 단위 시리즈(빈 날짜 0)로 이어 붙임
+    sealed_before = np.datetime64(datetime.now(timezone.utc).date(), 'D') - np.timedelta64(40, 'D')
+    chunks = []
+    for chunk_start in history_chunk_starts(start, end):
+        chunk_end = chunk_start + np.timedelta64(HISTORY_CHUNK_DAYS, 'D')
+        chunk_version = "sealed" if chunk_end <= sealed_before else data_version
+        chunks.append(get_history_chunk(engine, user_id, str(chunk_start), chunk_version))
+    days = pd.date_range(pd.Timestamp(start), pd.Timestamp(end), freq='D')
+    series = pd.concat(chunks) if chunks else pd.Series(dtype=np.int16)
+    return series.reindex(days, fill_value=0).astype(np.int16)
+
+def lttb_downsample(x, y, threshold=CHART_MAX_POINTS):
+    # Largest-Triangle-Three-Buckets: 모양을 유지하며 threshold 개의 점 인덱스를 고름
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = min(int((i + 1) * every) + 1, n - 1)
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def downsample_series(series, threshold=CHART_MAX_POINTS):
+    if len(series) <= threshold: return series
+    x = series.index.values.astype('datetime64[D]').astype(np.int64)
+    return series.iloc[lttb_downsample(x, series.values, threshold)]
+
+
+# 10. 외부 소스 보호: 소스별 제한 시간 + 서킷 브레이커 + 마지막 정상값(last-known-good)
+# - 호출은 별도 스레드에서 실행하고 deadline 안에 끝나지 않으면 실패로 처리 (페이지는 기다리지 않음)
+# - 연속 실패가 failure_threshold 에 도달하면 서킷 open → reset_timeout 동안 호출 없이 즉시 폴백
+# - reset_timeout 이 지나면 half-open 으로 한 번 시험 호출, 성공하면 close
+# - 폴백은 같은 key 로 마지막에 성공한 결과 (없으면 fallback 인자). last_good=False 인 소스는 항상 fallback
+#   (GitHub 응답은 레포마다 달라 다른 레포의 응답을 대신 쓰면 안 됨)
+# - 소스마다 별도 스레드 풀: deadline 을 넘긴 호출이 풀을 점유해도 다른 소스는 영향 없음
+# - with_outcome=True 면 (값, 결과) 를 돌려줌. 결과: "ok" | "open"(호출 안 함) | "rejected"(failure_if 해당, 값은 실제 응답)
+#   | "timeout"(요청 자체 timeout, 또는 실제 호출이 deadline 대부분을 쓰고도 끝나지 않음)
+#   | "queued"(deadline 대부분을 풀 대기로 씀: 상대 탓이 아니므로 서킷 실패로 세지 않고 작업 취소) | "error"(그 밖의 예외)
+SOURCE_POLICIES = {
+    # deadline 은 requests 자체 timeout(10초)보다 짧게: 느리지만 결국 성공하는 응답도 실패로 집계되어 서킷이 열림
+    "github":   {"deadline": 8,  "failure_threshold": 5, "reset_timeout": 120, "workers": 8, "last_good": False},
+    "yfinance": {"deadline": 5,  "failure_threshold": 3, "reset_timeout": 300, "workers": 2},
+    "geeknews": {"deadline": 5,  "failure_threshold": 3, "reset_timeout": 300, "workers": 2},
+}
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=3, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None: return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed": return True
+            if state == "half-open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures, self.opened_at, self.trial_in_flight = 0, None, False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+_breakers = {}
+_pools = {}
+_breakers_lock = threading.Lock()
+_last_good = {}
+
+def get_breaker(source):
+    with _breakers_lock:
+        if source not in _breakers:
+            policy = SOURCE_POLICIES.get(source, {})
+            _breakers[source] = CircuitBreaker(source, policy.get("failure_threshold", 3), policy.get("reset_timeout", 60))
+        return _breakers[source]
+
+def _get_pool(source):
+    with _breakers_lock:
+        if source not in _pools:
+            workers = SOURCE_POLICIES.get(source, {}).get("workers", 2)
+            _pools[source] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"external-{source}")
+        return _pools[source]
+
+def call_external(source, fn, key=None, fallback=None, deadline=None, failure_if=None, with_outcome=False):
+    policy = SOURCE_POLICIES.get(source, {})
+    breaker = get_breaker(source)
+    cache_key = (source, key)
+    use_last_good = policy.get("last_good", True)
+
+    def fail(outcome, value=None):
+        if value is None:
+            value = _last_good.get(cache_key, fallback) if use_last_good else fallback
+        return (value, outcome) if with_outcome else value
+
+    if not breaker.allow():
+        return fail("open")
+
+    deadline = deadline or policy.get("deadline", 10)
+    ctx = get_script_run_ctx(suppress_warning=True)
+
+    submitted = time.monotonic()
+    started = {}
+
+    def run():
+        started["at"] = time.monotonic()
+        # 세션 스레드에서 호출된 경우에만 작업 스레드에 세션 컨텍스트를 붙임 (세션 단위 계측용, bare 모드에서는 생략)
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return fn()
+
+    future = _get_pool(source).submit(run)
+    try:
+        result = future.result(timeout=deadline)
+    except Exception as e:
+        if isinstance(e, FutureTimeoutError) and not future.done():
+            # deadline 초과: 대부분을 풀 대기로 썼으면 상대 탓이 아님
+            waited = started.get("at", time.monotonic()) - submitted
+            if waited > deadline / 2:
+                future.cancel()
+                print(f"⚠️ {source} 호출 대기 초과 (풀 대기 {waited:.1f}s / {deadline}s) → 폴백 사용")
+                return fail("queued")
+            breaker.record_failure()
+            print(f"⚠️ {source} 호출 시간 초과 ({deadline}s) → 폴백 사용 (서킷: {breaker.state})")
+            return fail("timeout")
+        breaker.record_failure()
+        outcome = "timeout" if isinstance(e, (requests.Timeout, TimeoutError)) else "error"
+        print(f"⚠️ {source} 호출 실패 ({type(e).__name__}: {e}) → 폴백 사용 (서킷: {breaker.state})")
+        return fail(outcome)
+    if failure_if is not None and failure_if(result):
+        breaker.record_failure()
+        print(f"⚠️ {source} 실패 응답 ({getattr(result, 'status_code', result)}) (서킷: {breaker.state})")
+        return fail("rejected", result if with_outcome else None)
+
+    breaker.record_success()
+    if use_last_good:
+        _last_good[cache_key] = result
+    return (result, "ok") if with_outcome else result
+
+def external_status():
+    return {name: {"state": b.state, "failures": b.failures} for name, b in list(_breakers.items())}
+
+# 11. GeekNews 수집 (GEEKNEWS 페이지용)
+GEEKNEWS_URL = "https://news.hada.io/"
+
+def _fetch_geeknews():
+    headers = {'User-Agent': 'Mozilla/5.0'}
+    response = requests.get(GEEKNEWS_URL, headers=headers, timeout=5)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, 'html.parser')
+    items = []
+    for topic in soup.select('.topic_row')[:20]:
+        title_tag = topic.select_one('.topictitle a')
+        if not title_tag: continue
+        
+        title = title_tag.text.strip()
+        link = urljoin(GEEKNEWS_URL, title_tag['href'])
+        
+        desc_area = topic.select_one('.topicdesc')
+        if desc_area:
+            for extra in desc_area.find_all(['div', 'script', 'style', 'br']):
+                extra.decompose()
+            desc_text = desc_area.get_text(separator=" ").strip()
+            desc_text = re.sub(r'#+', '', desc_text)
+        else:
+            desc_text = ""
+        
+        meta_text = topic.select_one('.topicinfo').text.strip() if topic.select_one('.topicinfo') else ""
+        items.append({'title': title, 'link': link, 'desc': desc_text, 'meta': meta_text})
+    if not items:
+        raise RuntimeError("GeekNews page had no topics")
+    return items
+
+@st.cache_data(ttl=600)
+def get_cleaned_geeknews():
+    return call_external("geeknews", _fetch_geeknews, fallback=[])